@@ -2,13 +2,16 @@ import sys
 import os
 import time
 import random
-from config import load_config, ConfigError, Config
+from config import (load_config, ConfigError, Config, generation_endpoints,
+                    resolve_endpoints)
 from mazegen import MazeGenerator
-from mazegen.show_path import Solver
+from mazegen.show_path import SolveCache
 from mazegen.playmode import PlayMode
-from renderer import render_ascii, PALETTES
-from mazegen.generator import N, E, S, W
-from typing import List, Tuple
+from mazegen.trace import TraceRecorder, TracePlayer, load_trace
+from mazegen.export import export_hex_file, export_image, write_hex
+from renderer import render_ascii, PALETTES, RENDERERS
+from prefetch import Prefetcher
+from typing import Dict, List, Optional, Tuple
 
 
 def clear_screen() -> None:
@@ -20,7 +23,8 @@ def clear_screen() -> None:
 
 def generate_and_render(
     config: Config,
-    pal_idx: int
+    pal_idx: int,
+    generator: Optional[MazeGenerator] = None
 ) -> Tuple[MazeGenerator, List[List[int]], int]:
     """
     Generate a maze and render it step-by-step with animation.
@@ -29,6 +33,10 @@ def generate_and_render(
     - config: Config object containing maze settings
               (width, height, entry, exit, seed, perfect).
     - pal_idx: Index of the selected color palette.
+    - generator: previous generator to reset and reuse, if any.
+
+    ENTRY/EXIT set to auto are placed once the maze is carved and
+    written back to config.
 
     Returns:
     - Tuple containing:
@@ -37,24 +45,31 @@ def generate_and_render(
         - The seed value used for generation.
     """
     s = config.seed if config.seed is not None else random.randint(0, 999999)
-    generator = MazeGenerator(
-        width=config.width,
-        height=config.height,
-        entry=config.entry,
-        exit=config.exit,
-        seed=s,
-    )
+    entry, exit_ = generation_endpoints(config)
+    if generator is not None:
+        generator.reset(seed=s, entry=entry, exit=exit_)
+    else:
+        generator = MazeGenerator(
+            width=config.width,
+            height=config.height,
+            entry=entry,
+            exit=exit_,
+            seed=s,
+            rng=config.rng,
+        )
+    recorder = TraceRecorder(generator) if config.trace_file else None
     pal = PALETTES[pal_idx]
     theme = {"walls": pal["walls"], "inner": pal["inner"],
              "pattern": pal["pattern"]}
 
+    render = RENDERERS[config.render]
     for grid, current_cell in generator.generate_animated(
          perfect=config.perfect):
         clear_screen()
-        render_ascii(
+        render(
             grid,
-            config.entry,
-            config.exit,
+            entry,
+            exit_,
             theme,
             show_42=True,
             current_cell=current_cell
@@ -62,33 +77,80 @@ def generate_and_render(
         time.sleep(0.03)
 
     grid = generator.get_cells()
+    if config.auto_entry or config.auto_exit:
+        config.entry, config.exit = resolve_endpoints(config, grid)
+        generator.entry, generator.exit = config.entry, config.exit
+    if recorder is not None and config.trace_file:
+        # Saved after resolve_endpoints() so the trace header holds the
+        # placed entry/exit, as for prefetched mazes
+        recorder.detach()
+        recorder.save(config.trace_file)
     return generator, grid, s
 
 
+def replay_trace(filename: str, speed: int = 1, pal_idx: int = 0) -> None:
+    """
+    Replay a generation trace written with TRACE_FILE.
+    speed is the number of carves per frame, negative plays backward.
+    """
+    trace = load_trace(filename)
+    pal = PALETTES[pal_idx]
+    theme = {"walls": pal["walls"], "inner": pal["inner"],
+             "pattern": pal["pattern"]}
+    start = 0 if speed > 0 else len(trace)
+    for grid, current_cell in TracePlayer(trace).frames(start, speed=speed):
+        clear_screen()
+        render_ascii(
+            grid,
+            trace.entry,
+            trace.exit,
+            theme,
+            show_42=True,
+            current_cell=current_cell
+        )
+        time.sleep(0.03)
+
+
 def save_maze_to_file_hex(
     grid: List[List[int]],
-    config: Config
+    config: Config,
+    cache: Optional[SolveCache] = None,
+    version: Optional[int] = None
+) -> None:
+    """
+    Save maze to file using hex digits, then entry, exit, shortest path.
+    The path comes from cache (keyed on version, the generator's grid
+    version) so later consumers of the same maze do not solve again.
+    """
+    path_dirs = (cache or SolveCache()).solve(
+        grid, config.entry, config.exit, version
+    ).path
+    write_hex(config.output_file, grid, config.entry, config.exit, path_dirs)
+
+
+def save_maze_image(
+    grid: List[List[int]],
+    config: Config,
+    theme: Dict[str, str],
+    cache: Optional[SolveCache] = None,
+    version: Optional[int] = None
 ) -> None:
-    """Save maze to file using hex digits, then entry, exit, shortest path."""
-    lines = []
-
-    for row in grid:
-        line = "".join(f"{cell:X}" for cell in row)
-        lines.append(line)
-
-    lines.append("")
-    lines.append(f"{config.entry[0]} {config.entry[1]}")
-    lines.append(f"{config.exit[0]} {config.exit[1]}")
-    path_dirs = Solver.solve_bfs(
-        grid=grid,
+    """Export maze and shortest path to IMAGE_FILE with the active theme."""
+    if not config.image_file:
+        return
+    solution = (cache or SolveCache()).solve(
+        grid, config.entry, config.exit, version
+    )
+    export_image(
+        config.image_file,
+        grid,
+        config.width,
+        config.height,
+        theme,
         entry=config.entry,
-        exit_=config.exit
+        exit_=config.exit,
+        path_cells=set(solution.cells),
     )
-    dir_map = {N: "N", E: "E", S: "S", W: "W"}
-    path_str = "".join(dir_map[d] for d in path_dirs)
-    lines.append(path_str)
-    with open(config.output_file, "w") as f:
-        f.write("\n".join(lines) + "\n")
 
 
 BLUE = "\033[34m"
@@ -104,8 +166,29 @@ def main() -> None:
     Loads configuration, generates the maze, displays it,
     and provides a menu for regenerating, solving, or playing the maze.
     """
+    if len(sys.argv) in (3, 4) and sys.argv[1] == "--replay":
+        try:
+            speed = int(sys.argv[3]) if len(sys.argv) == 4 else 1
+            replay_trace(sys.argv[2], speed or 1)
+        except (OSError, ValueError) as error:
+            print(f"Replay error: {error}")
+            sys.exit(1)
+        return
+    if len(sys.argv) in (4, 5) and sys.argv[1] == "--export":
+        try:
+            pal = PALETTES[int(sys.argv[4]) if len(sys.argv) == 5 else 0]
+            theme = {"walls": pal["walls"], "inner": pal["inner"],
+                     "pattern": pal["pattern"]}
+            export_hex_file(sys.argv[2], sys.argv[3], theme)
+        except (OSError, ValueError, IndexError) as error:
+            print(f"Export error: {error}")
+            sys.exit(1)
+        return
     if len(sys.argv) != 2:
-        print("Usage: python3 a_maze_ing.py config.txt")
+        print("Usage: python3 a_maze_ing.py config.txt\n"
+              "       python3 a_maze_ing.py --replay trace_file [speed]\n"
+              "       python3 a_maze_ing.py --export maze.txt image.png|svg"
+              " [palette]")
         sys.exit(1)
     try:
         from animations import show_intro
@@ -113,7 +196,8 @@ def main() -> None:
         pal_idx = 0
         show_intro()
         generator, grid, seed = generate_and_render(config, pal_idx)
-        save_maze_to_file_hex(grid, config)
+        cache = SolveCache()
+        save_maze_to_file_hex(grid, config, cache, generator.version)
 
         path_cells = None
         pal = PALETTES[pal_idx]
@@ -122,6 +206,9 @@ def main() -> None:
             "inner": pal["inner"],
             "pattern": pal["pattern"],
         }
+        save_maze_image(grid, config, theme, cache, generator.version)
+        prefetcher = Prefetcher(config)
+        render = RENDERERS[config.render]
 
         while True:
             print(f"{BLUE} ▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄{RESET}")
@@ -140,29 +227,43 @@ def main() -> None:
             print(f"{BLUE} ▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀{RESET}")
             choice = input("> ").strip().lower()
             if choice == "q":
+                prefetcher.close()
                 break
             elif choice == "r":
-                generator, grid, seed = generate_and_render(config, pal_idx)
-                save_maze_to_file_hex(grid, config)
+                ready = prefetcher.take()
+                if ready is None:
+                    generator, grid, seed = generate_and_render(
+                        config, pal_idx, generator)
+                else:
+                    prefetcher.recycle(generator)
+                    generator, grid, seed = (ready.generator, ready.grid,
+                                             ready.seed)
+                    cache = ready.cache
+                    config.entry, config.exit = ready.entry, ready.exit
+                    if ready.recorder is not None and config.trace_file:
+                        ready.recorder.save(config.trace_file)
+                    clear_screen()
+                    render(grid, config.entry, config.exit, theme,
+                           show_42=True)
+                save_maze_to_file_hex(grid, config, cache, generator.version)
+                save_maze_image(grid, config, theme, cache,
+                                generator.version)
                 path_cells = None
             elif choice == "s":
                 if path_cells:
                     path_cells = None
                     clear_screen()
-                    render_ascii(grid, config.entry, config.exit, theme,
-                                 show_42=True)
+                    render(grid, config.entry, config.exit, theme,
+                           show_42=True)
                     continue
-                path_dirs = Solver.solve_bfs(
-                    grid=grid,
-                    entry=config.entry,
-                    exit_=config.exit
-                )
-                cells = Solver.path_to_cells(config.entry, path_dirs)
+                cells = cache.solve(
+                    grid, config.entry, config.exit, generator.version
+                ).cells
                 visible = set()
                 for c in cells[1:-1]:
                     visible.add(c)
                     clear_screen()
-                    render_ascii(
+                    render(
                         grid,
                         config.entry,
                         config.exit,
@@ -177,7 +278,9 @@ def main() -> None:
                     maze=generator,
                     entry=config.entry,
                     exit_=config.exit,
-                    theme=theme
+                    theme=theme,
+                    cache=cache,
+                    render=render
                 )
             elif choice == "c":
                 pal_idx = (pal_idx + 1) % len(PALETTES)
@@ -188,8 +291,10 @@ def main() -> None:
                     "inner": pal["inner"],
                     "pattern": pal["pattern"],
                 }
-                render_ascii(grid, config.entry, config.exit, theme,
-                             show_42=True)
+                save_maze_image(grid, config, theme, cache,
+                                generator.version)
+                render(grid, config.entry, config.exit, theme,
+                       show_42=True)
             elif choice == "i":
                 text = [
                     "░▀█▀░█▀█░█▀▀░█▀█",
@@ -0,0 +1,68 @@
+"""
+Compare building a new MazeGenerator per maze with MazePool reuse.
+
+For each variant a full cycle (construct or reset, then generate) is
+timed, and tracemalloc measures per cycle the peak memory allocated
+on top of the starting point (transient churn: grid, stack, neighbour
+lists...) and the memory still held afterwards.
+
+Usage: python3 benchmarks/bench_pool.py [count] [width] [height]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mazegen import MazeGenerator  # noqa: E402
+
+
+def cycle_memory(cycle: Callable[[int], object],
+                 count: int) -> Tuple[float, float]:
+    """Average (peak, retained) bytes traced per cycle."""
+    peak = retained = 0
+    gc.collect()
+    tracemalloc.start()
+    for seed in range(count):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        cycle(seed)
+        current, top = tracemalloc.get_traced_memory()
+        peak += top - before
+        retained += current - before
+    tracemalloc.stop()
+    return peak / count, retained / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+    exit_ = (width - 1, height - 1)
+    reused = MazeGenerator(width, height, (0, 0), exit_, 0)
+
+    def fresh(seed: int) -> object:
+        return MazeGenerator(width, height, (0, 0), exit_, seed).generate()
+
+    def pooled(seed: int) -> object:
+        reused.reset(seed=seed)
+        return reused.generate()
+
+    print(f"{count} mazes of {width}x{height}")
+    for name, cycle in (("new generator", fresh), ("MazePool", pooled)):
+        gc.collect()
+        start = time.perf_counter()
+        for seed in range(count):
+            cycle(seed)
+        elapsed = time.perf_counter() - start
+        peak, retained = cycle_memory(cycle, min(count, 500))
+        print(f"  {name:14} {elapsed / count * 1e6:8.1f} us/maze  "
+              f"peak {peak / 1024:7.1f} KiB/maze  "
+              f"retained {retained:7.1f} B/maze")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 
-from typing import Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional
 from renderer import get_42_pattern_coords
+from mazegen.rng import RNG_MODES
+from mazegen.show_path import Solver
+RENDER_MODES = ("ascii", "compact")
 
 
 class ConfigError(Exception):
@@ -20,6 +23,12 @@ class Config:
         output_file: str,
         perfect: bool,
         seed: Optional[int] = None,
+        rng: str = "legacy",
+        trace_file: Optional[str] = None,
+        image_file: Optional[str] = None,
+        render: str = "ascii",
+        auto_entry: bool = False,
+        auto_exit: bool = False,
     ) -> None:
         self.width = width
         self.height = height
@@ -28,6 +37,12 @@ class Config:
         self.output_file = output_file
         self.perfect = perfect
         self.seed = seed
+        self.rng = rng
+        self.trace_file = trace_file
+        self.image_file = image_file
+        self.render = render
+        self.auto_entry = auto_entry
+        self.auto_exit = auto_exit
 
 
 def parse_coords(value: str) -> Tuple[int, int]:
@@ -77,7 +92,8 @@ def validate_config(config: Config) -> None:
     if not (0 <= ox < config.width and 0 <= oy < config.height):
         raise ConfigError(f"Exit coordinates out of bounds: {config.exit}")
 
-    if config.entry == config.exit:
+    if (config.entry == config.exit and not config.auto_entry
+            and not config.auto_exit):
         raise ConfigError("Entry and exit must be different")
 
     if not config.output_file or config.output_file.strip() == "":
@@ -86,6 +102,9 @@ def validate_config(config: Config) -> None:
         raise ConfigError("OUTPUT_FILE cannot be a directory")
     if "/" in config.output_file and config.output_file.endswith("/"):
         raise ConfigError("Invalid output filename")
+    if config.image_file and not config.image_file.lower().endswith(
+            (".png", ".svg")):
+        raise ConfigError("IMAGE_FILE must end with .png or .svg")
     if not config.output_file.endswith(".txt"):
         print("\033[33mWarning: output file should be .txt\033[0m")
     try:
@@ -109,7 +128,8 @@ def load_config(filename: str) -> Config:
     config_data: Dict[str, str] = {}
     valid_keys = {
         "WIDTH", "HEIGHT", "ENTRY", "EXIT", "OUTPUT_FILE",
-        "PERFECT", "SEED"
+        "PERFECT", "SEED", "RNG", "TRACE_FILE", "IMAGE_FILE",
+        "RENDER"
     }
 
     try:
@@ -148,13 +168,18 @@ def load_config(filename: str) -> Config:
     except ValueError:
         raise ConfigError("HEIGHT must be an integer")
 
+    # ENTRY=auto / EXIT=auto start from the generation_endpoints()
+    # corners and are moved after generation by resolve_endpoints()
     try:
-        entry = parse_coords(config_data["ENTRY"])
+        auto_entry = config_data["ENTRY"].lower() == "auto"
+        entry = (0, 0) if auto_entry else parse_coords(config_data["ENTRY"])
     except KeyError:
         raise ConfigError("Missing ENTRY")
 
     try:
-        exit_ = parse_coords(config_data["EXIT"])
+        auto_exit = config_data["EXIT"].lower() == "auto"
+        exit_ = ((width - 1, height - 1) if auto_exit
+                 else parse_coords(config_data["EXIT"]))
     except KeyError:
         raise ConfigError("Missing EXIT")
 
@@ -175,6 +200,47 @@ def load_config(filename: str) -> Config:
         except ValueError:
             raise ConfigError("SEED must be an integer")
 
-    cfg = Config(width, height, entry, exit_, output_file, perfect, seed)
+    rng = config_data.get("RNG", "legacy").strip().lower() or "legacy"
+    if rng not in RNG_MODES:
+        raise ConfigError(f"RNG must be one of: {', '.join(RNG_MODES)}")
+
+    trace_file = config_data.get("TRACE_FILE", "").strip() or None
+    image_file = config_data.get("IMAGE_FILE", "").strip() or None
+
+    render = config_data.get("RENDER", "ascii").strip().lower() or "ascii"
+    if render not in RENDER_MODES:
+        raise ConfigError(f"RENDER must be one of: {', '.join(RENDER_MODES)}")
+
+    cfg = Config(width, height, entry, exit_, output_file, perfect, seed,
+                 rng, trace_file, image_file, render, auto_entry, auto_exit)
     validate_config(cfg)
     return cfg
+
+
+def generation_endpoints(
+    config: Config
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Return the (entry, exit) to generate with: opposite corners for
+    auto endpoints, so a seed gives the same maze on every regen.
+    """
+    return (
+        (0, 0) if config.auto_entry else config.entry,
+        (config.width - 1, config.height - 1) if config.auto_exit
+        else config.exit,
+    )
+
+
+def resolve_endpoints(
+    config: Config,
+    grid: List[List[int]]
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Return (entry, exit) for a generated grid: ENTRY/EXIT set to auto
+    are placed on the border to make the solution as long as possible.
+    """
+    return Solver.best_endpoints(
+        grid,
+        None if config.auto_entry else config.entry,
+        None if config.auto_exit else config.exit,
+    )
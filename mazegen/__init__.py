@@ -1,3 +1,13 @@
-from .generator import MazeGenerator
+from typing import Any
 
-__all__ = ["MazeGenerator"]
+from .generator import MazeGenerator, MazePool
+
+__all__ = ["MazeGenerator", "MazePool", "generate_batch"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import generate_batch on first use: it needs numpy."""
+    if name == "generate_batch":
+        from .batch import generate_batch
+        return generate_batch
+    raise AttributeError(f"module 'mazegen' has no attribute '{name}'")
@@ -0,0 +1,308 @@
+import os
+import sys
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .export import write_hex
+from .generator import N, E, S, W, pattern_42
+from .rng import GOLDEN, CounterRNG
+from .show_path import Solver
+from .validate import validate_grid
+
+FULL = N | E | S | W
+ALGORITHMS = ("kruskal", "binary_tree")
+# Sizes checked by main(): the first two are below the 9x7 minimum, so
+# they have no 42 pattern
+CHECK_SIZES = ((4, 3), (8, 6), (9, 7), (15, 11), (20, 20), (30, 9))
+# generate_batch carves this many cells per chunk (about 4600 15x15
+# mazes), which bounds its working memory and keeps flat int32 indices
+CHUNK_CELLS = 1 << 20
+
+EdgeTable = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def mix64(z: np.ndarray) -> np.ndarray:
+    """rng.mix64 over a uint64 array (multiplications wrap mod 2**64)."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return z
+
+
+def draws(keys: Sequence[int], counters: np.ndarray) -> np.ndarray:
+    """
+    Return a (len(keys), len(counters)) uint64 array: row b holds the
+    draws numbered counters of the CounterRNG stream with key keys[b],
+    like CounterRNG.at().
+    """
+    key = np.array(keys, dtype=np.uint64)[:, np.newaxis]
+    steps = (counters.astype(np.uint64) + np.uint64(1)) * np.uint64(GOLDEN)
+    return mix64(key + steps)
+
+
+def blocked_mask(width: int, height: int) -> np.ndarray:
+    """(H, W) mask of the 42 pattern, empty below the 9x7 minimum."""
+    blocked = np.zeros((height, width), dtype=bool)
+    if width >= 9 and height >= 7:
+        for x, y in pattern_42(width, height):
+            blocked[y, x] = True
+    return blocked
+
+
+def edge_table(width: int, height: int) -> EdgeTable:
+    """
+    Return (u, v, wall_u, wall_v, allowed) for every inner wall.
+    Edge ids run over horizontal walls in row order, then vertical
+    ones: edge e joins flat cells u[e] and v[e] (v is east or south of
+    u) by clearing wall_u[e] in u and wall_v[e] in v. allowed lists the
+    edge ids that touch no 42 pattern cell, ascending.
+    """
+    index = np.arange(width * height, dtype=np.int32).reshape(height, width)
+    u = np.concatenate([index[:, :-1].ravel(), index[:-1, :].ravel()])
+    v = np.concatenate([index[:, 1:].ravel(), index[1:, :].ravel()])
+    horizontal = height * (width - 1)
+    wall_u = np.where(np.arange(u.size) < horizontal, E, S).astype(np.uint8)
+    wall_v = np.where(np.arange(u.size) < horizontal, W, N).astype(np.uint8)
+    blocked = blocked_mask(width, height).ravel()
+    allowed = np.flatnonzero(~blocked[u] & ~blocked[v]).astype(np.int32)
+    return u, v, wall_u, wall_v, allowed
+
+
+def _find(parent: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """Find the roots of flat cells in a chunk's parent, halving paths."""
+    while True:
+        up = parent[cells]
+        if np.array_equal(up, cells):
+            return cells
+        grand = parent[up]
+        parent[cells] = grand
+        cells = grand
+
+
+def _binary_tree_links(
+    width: int,
+    height: int,
+    keys: Sequence[int],
+) -> np.ndarray:
+    """
+    Return the (B, H * W) edge id each open cell links through, or -1.
+    Cells link north or east: when both neighbours are open, bit 0 of
+    their draw picks east, otherwise the only open one is taken.
+    """
+    blocked = blocked_mask(width, height)
+    index = np.arange(width * height, dtype=np.int32).reshape(height, width)
+    north = np.full((height, width), -1, dtype=np.int32)
+    east = np.full((height, width), -1, dtype=np.int32)
+    vertical = height * (width - 1)
+    north[1:, :] = vertical + index[:-1, :]
+    east[:, :-1] = index[:, :-1] - np.arange(height)[:, np.newaxis]
+    north[1:, :][blocked[:-1, :]] = -1
+    east[:, :-1][blocked[:, 1:]] = -1
+    north[blocked] = east[blocked] = -1
+    up, right = north.ravel(), east.ravel()
+    coin = (draws(keys, np.arange(width * height)) & np.uint64(1)) != 0
+    return np.where(up >= 0, np.where((right >= 0) & coin, right, up), right)
+
+
+def generate_batch(
+    n: int,
+    width: int,
+    height: int,
+    seeds: Optional[Sequence[int]] = None,
+    algorithm: str = "kruskal",
+) -> np.ndarray:
+    """
+    Carve n perfect mazes at once as a (n, height, width) uint8 array.
+
+    Maze b uses seeds[b] (default b) through CounterRNG substreams, so
+    it matches generate_one(width, height, seeds[b], algorithm) and
+    does not depend on the rest of the batch. The 42 pattern stays
+    fully walled. Mazes are carved CHUNK_CELLS cells at a time, so
+    working memory stays near 60 MB whatever n is (plus the n * H * W
+    byte result). Within a chunk every step works on all mazes with
+    one array operation: "kruskal" adds one random-weighted edge per
+    maze per step; "binary_tree" links all cells north or east in one
+    go, then a Kruskal pass joins the pockets the 42 pattern leaves.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"algorithm must be one of: {', '.join(ALGORITHMS)}")
+    if width <= 0 or height <= 0:
+        raise ValueError("Width and height must be positive")
+    seeds = list(range(n)) if seeds is None else list(seeds)
+    if len(seeds) != n:
+        raise ValueError(f"Expected {n} seeds, got {len(seeds)}")
+
+    grid = np.full((n, height, width), FULL, dtype=np.uint8)
+    step = max(1, CHUNK_CELLS // (width * height))
+    for start in range(0, n, step):
+        _carve_chunk(grid[start:start + step].reshape(-1), width, height,
+                     seeds[start:start + step], algorithm)
+    return grid
+
+
+def _carve_chunk(
+    grid: np.ndarray,
+    width: int,
+    height: int,
+    seeds: Sequence[int],
+    algorithm: str,
+) -> None:
+    """
+    Carve len(seeds) mazes into grid, their flat (B * H * W) view.
+    Cells are flat indices into the chunk: maze b owns b * H * W up to
+    (b + 1) * H * W, so one union-find parent array serves all mazes.
+    """
+    cells = width * height
+    u, v, wall_u, wall_v, allowed = edge_table(width, height)
+    clear_u = (FULL ^ wall_u).astype(np.uint8)
+    clear_v = (FULL ^ wall_v).astype(np.uint8)
+    base = np.arange(len(seeds), dtype=np.int32) * np.int32(cells)
+    parent = np.arange(len(seeds) * cells, dtype=np.int32)
+    joined = np.zeros(len(seeds), dtype=np.int32)
+    target = cells - int(blocked_mask(width, height).sum()) - 1
+
+    if algorithm == "binary_tree":
+        links = _binary_tree_links(
+            width, height,
+            [CounterRNG(s).substream("links").key for s in seeds])
+        b, cell = np.nonzero(links >= 0)
+        e = links[b, cell]
+        offset = base[b]
+        np.bitwise_and.at(grid, offset + u[e], clear_u[e])
+        np.bitwise_and.at(grid, offset + v[e], clear_v[e])
+        parent[offset + cell] = offset + np.where(u[e] == cell, v[e], u[e])
+        joined += np.count_nonzero(links >= 0, axis=1).astype(np.int32)
+
+    weights = draws([CounterRNG(s).substream("edges").key for s in seeds],
+                    allowed)
+    # Rank-major so each step reads one contiguous row of edge ids
+    order = np.ascontiguousarray(
+        allowed[np.argsort(weights, axis=1, kind="stable")].T)
+    del weights
+    for e in order:
+        if (joined >= target).all():
+            break
+        a = _find(parent, base + u[e])
+        c = _find(parent, base + v[e])
+        merge = a != c
+        parent[a[merge]] = c[merge]
+        e = e[merge]
+        grid[base[merge] + u[e]] &= clear_u[e]
+        grid[base[merge] + v[e]] &= clear_v[e]
+        joined += merge
+
+
+def generate_one(
+    width: int,
+    height: int,
+    seed: int,
+    algorithm: str = "kruskal",
+) -> List[List[int]]:
+    """
+    Carve one maze of generate_batch cell by cell in plain Python.
+    Slow: it is the reference generate_batch is checked against.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"algorithm must be one of: {', '.join(ALGORITHMS)}")
+    u, v, wall_u, wall_v, allowed = (t.tolist() for t in edge_table(width,
+                                                                    height))
+    blocked = blocked_mask(width, height).ravel().tolist()
+    grid = [FULL] * (width * height)
+    parent = list(range(width * height))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def join(e: int) -> None:
+        a, b = find(u[e]), find(v[e])
+        if a != b:
+            parent[a] = b
+            grid[u[e]] &= ~wall_u[e]
+            grid[v[e]] &= ~wall_v[e]
+
+    if algorithm == "binary_tree":
+        links = CounterRNG(seed).substream("links")
+        vertical = height * (width - 1)
+        for i in range(width * height):
+            y, x = divmod(i, width)
+            options = []
+            if y > 0 and not blocked[i] and not blocked[i - width]:
+                options.append(vertical + i - width)
+            if x < width - 1 and not blocked[i] and not blocked[i + 1]:
+                options.append(i - y)
+            if options:
+                join(options[links.at(i) & 1 if len(options) == 2 else 0])
+
+    edges = CounterRNG(seed).substream("edges")
+    for e in sorted(allowed, key=lambda e: (edges.at(e), e)):
+        join(e)
+    return [grid[y * width:(y + 1) * width] for y in range(height)]
+
+
+def save_batch_hex(
+    batch: np.ndarray,
+    directory: str,
+    entry: Tuple[int, int],
+    exit_: Tuple[int, int],
+    prefix: str = "maze",
+) -> List[str]:
+    """
+    Write every maze of a batch as a hex file with its solution, like
+    OUTPUT_FILE, to directory/prefix_00000.txt and so on.
+    Returns the file names.
+    """
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    for b, maze in enumerate(batch):
+        grid = maze.tolist()
+        filename = os.path.join(directory, f"{prefix}_{b:05d}.txt")
+        write_hex(filename, grid, entry, exit_,
+                  Solver.solve_bfs(grid, entry, exit_))
+        filenames.append(filename)
+    return filenames
+
+
+def check_batch(
+    width: int,
+    height: int,
+    seeds: Sequence[int],
+    algorithm: str = "kruskal",
+) -> List[str]:
+    """
+    Compare generate_batch with generate_one for every seed and check
+    each maze is a valid perfect maze. Returns one message per failure.
+    """
+    batch = generate_batch(len(seeds), width, height, seeds, algorithm)
+    failures = []
+    for maze, seed in zip(batch, seeds):
+        where = f"{algorithm} {width}x{height} seed {seed}"
+        if maze.tolist() != generate_one(width, height, seed, algorithm):
+            failures.append(f"{where}: differs from generate_one")
+        violation = validate_grid(maze, perfect=True)
+        if violation is not None:
+            failures.append(f"{where}: {violation}")
+    return failures
+
+
+def main() -> None:
+    """python3 -m mazegen.batch [count]: check batches against generate_one."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seeds = list(range(count)) + [123456, 999999]
+    failed = 0
+    for algorithm in ALGORITHMS:
+        for width, height in CHECK_SIZES:
+            failures = check_batch(width, height, seeds, algorithm)
+            for message in failures:
+                print(message)
+            failed += len(failures)
+            print(f"{algorithm} {width}x{height}: "
+                  f"{len(seeds) - len(failures)}/{len(seeds)} ok")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+import struct
+import zlib
+from typing import (BinaryIO, Dict, Iterable, Iterator, List, Optional,
+                    Sequence, Set, TextIO, Tuple)
+
+from .generator import N, E, S, W, DX, DY, pattern_42
+
+PATH_COLOR = "38;5;208"
+BACKGROUND = (0, 0, 0)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_SIZE = 1 << 16
+BASIC_COLORS = [
+    (0, 0, 0), (128, 0, 0), (0, 128, 0), (128, 128, 0),
+    (0, 0, 128), (128, 0, 128), (0, 128, 128), (192, 192, 192),
+    (128, 128, 128), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (0, 0, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+]
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+LETTERS = {"N": N, "E": E, "S": S, "W": W}
+
+# fill codes used by both exporters
+EMPTY, ENDPOINT, PATTERN, PATH = 0, 1, 2, 3
+
+
+def ansi_to_rgb(code: str) -> Tuple[int, int, int]:
+    """
+    Convert an ANSI color like the PALETTES entries ('38;5;160')
+    or a basic code ('33', '92') to RGB.
+    """
+    parts = code.split(";")
+    if len(parts) >= 3 and parts[-2] == "5":
+        n = int(parts[-1])
+        if n < 16:
+            return BASIC_COLORS[n]
+        if n < 232:
+            n -= 16
+            return (CUBE_LEVELS[n // 36], CUBE_LEVELS[n // 6 % 6],
+                    CUBE_LEVELS[n % 6])
+        level = 8 + 10 * (n - 232)
+        return level, level, level
+    n = int(parts[-1])
+    if 30 <= n <= 37:
+        return BASIC_COLORS[n - 30]
+    if 90 <= n <= 97:
+        return BASIC_COLORS[n - 82]
+    raise ValueError(f"Unsupported color code '{code}'")
+
+
+def iter_hex_rows(filename: str) -> Iterator[List[int]]:
+    """Stream the grid rows of a hex maze file, one list per row."""
+    with open(filename, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                return
+            yield [int(c, 16) for c in line]
+
+
+def hex_file_info(
+    filename: str,
+) -> Tuple[int, int, Tuple[int, int], Tuple[int, int], str]:
+    """
+    Scan a hex maze file without keeping its rows.
+    Returns (width, height, entry, exit, path letters).
+    """
+    width = height = 0
+    footer: List[str] = []
+    with open(filename, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                break
+            width = len(line)
+            height += 1
+        for line in f:
+            footer.append(line.strip())
+    if len(footer) < 2:
+        raise ValueError(f"'{filename}' has no entry/exit lines")
+    ex, ey = map(int, footer[0].split())
+    ox, oy = map(int, footer[1].split())
+    path = footer[2] if len(footer) > 2 else ""
+    return width, height, (ex, ey), (ox, oy), path
+
+
+def write_hex(
+    filename: str,
+    grid: Iterable[Sequence[int]],
+    entry: Tuple[int, int],
+    exit_: Tuple[int, int],
+    path: Sequence[int],
+) -> None:
+    """
+    Write a maze file: one hex digit per cell, a blank line, the entry
+    and exit as 'x y', then the path as N/E/S/W letters.
+    """
+    letters = {d: letter for letter, d in LETTERS.items()}
+    with open(filename, "w") as f:
+        for row in grid:
+            f.write("".join(f"{cell:X}" for cell in row) + "\n")
+        f.write(f"\n{entry[0]} {entry[1]}\n{exit_[0]} {exit_[1]}\n")
+        f.write("".join(letters[d] for d in path) + "\n")
+
+
+def path_letters_to_cells(
+    entry: Tuple[int, int],
+    path: str,
+) -> Set[Tuple[int, int]]:
+    """Return the cells visited by an N/E/S/W path string."""
+    x, y = entry
+    cells = {(x, y)}
+    for letter in path:
+        d = LETTERS[letter]
+        x, y = x + DX[d], y + DY[d]
+        cells.add((x, y))
+    return cells
+
+
+def _fills_by_row(
+    width: int,
+    height: int,
+    entry: Optional[Tuple[int, int]],
+    exit_: Optional[Tuple[int, int]],
+    path_cells: Optional[Set[Tuple[int, int]]],
+    show_42: bool,
+) -> Dict[int, Dict[int, int]]:
+    """Map y -> {x: fill code} for every non-empty cell."""
+    fills: Dict[int, Dict[int, int]] = {}
+    if show_42 and width >= 9 and height >= 7:
+        for x, y in pattern_42(width, height):
+            fills.setdefault(y, {})[x] = PATTERN
+    for x, y in path_cells or ():
+        fills.setdefault(y, {})[x] = PATH
+    for cell in (entry, exit_):
+        if cell is not None:
+            fills.setdefault(cell[1], {})[cell[0]] = ENDPOINT
+    return fills
+
+
+def _png_chunk(f: BinaryIO, tag: bytes, data: bytes) -> None:
+    """Write one PNG chunk."""
+    f.write(struct.pack(">I", len(data)))
+    f.write(tag)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def export_png(
+    rows: Iterable[Sequence[int]],
+    width: int,
+    height: int,
+    filename: str,
+    theme: Dict[str, str],
+    entry: Optional[Tuple[int, int]] = None,
+    exit_: Optional[Tuple[int, int]] = None,
+    path_cells: Optional[Set[Tuple[int, int]]] = None,
+    show_42: bool = True,
+    scale: int = 4,
+) -> None:
+    """
+    Write the maze as a palette PNG, streaming one maze row at a time.
+
+    Each cell is scale x scale pixels plus a shared 1 pixel wall line,
+    so the image is (width * scale + 1) x (height * scale + 1).
+    Only the scanlines of the current row and the compressor state are
+    held in memory; rows can come from a grid or iter_hex_rows().
+    """
+    if scale < 2:
+        raise ValueError("scale must be at least 2")
+    palette = [
+        BACKGROUND,
+        ansi_to_rgb(theme["walls"]),
+        ansi_to_rgb(theme["inner"]),
+        ansi_to_rgb(theme["pattern"]),
+        ansi_to_rgb(PATH_COLOR),
+    ]
+    # palette index of each fill code
+    fill_index = {EMPTY: 0, ENDPOINT: 2, PATTERN: 3, PATH: 4}
+    wall, bg = b"\x01", b"\x00"
+    inner = scale - 1
+    top = [wall + bg * inner, wall + wall * inner]
+    mid = {
+        (closed, fill): (wall if closed else bg) + bytes([index]) * inner
+        for closed in (0, 1) for fill, index in fill_index.items()
+    }
+    fills = _fills_by_row(width, height, entry, exit_, path_cells, show_42)
+    compressor = zlib.compressobj()
+    pending: List[bytes] = []
+    pending_size = 0
+
+    with open(filename, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        _png_chunk(f, b"IHDR", struct.pack(
+            ">IIBBBBB", width * scale + 1, height * scale + 1, 8, 3, 0, 0, 0
+        ))
+        _png_chunk(f, b"PLTE", b"".join(bytes(rgb) for rgb in palette))
+
+        def emit(scanline: bytes) -> None:
+            nonlocal pending_size
+            data = compressor.compress(b"\x00" + scanline)
+            if data:
+                pending.append(data)
+                pending_size += len(data)
+            if pending_size >= IDAT_SIZE:
+                _png_chunk(f, b"IDAT", b"".join(pending))
+                pending.clear()
+                pending_size = 0
+
+        last: Sequence[int] = ()
+        for y, row in enumerate(rows):
+            row_fills = fills.get(y, {})
+            emit(b"".join(top[cell & N != 0] for cell in row) + wall)
+            line = b"".join(
+                mid[(cell & W != 0, row_fills.get(x, EMPTY))]
+                for x, cell in enumerate(row)
+            ) + (wall if row[-1] & E else bg)
+            for _ in range(inner):
+                emit(line)
+            last = row
+        emit(b"".join(top[cell & S != 0] for cell in last) + wall)
+
+        pending.append(compressor.flush())
+        _png_chunk(f, b"IDAT", b"".join(pending))
+        _png_chunk(f, b"IEND", b"")
+
+
+def _hex(rgb: Tuple[int, int, int]) -> str:
+    """Return an SVG #rrggbb color."""
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def _write_runs(
+    out: TextIO,
+    runs: List[Tuple[int, int]],
+    y: int,
+    scale: int,
+    inset: int,
+    color: str,
+) -> None:
+    """Write merged horizontal cell runs [x0, x1) of row y as rects."""
+    size = scale - 2 * inset
+    for x0, x1 in runs:
+        out.write(f'<rect x="{x0 * scale + inset}" y="{y * scale + inset}" '
+                  f'width="{(x1 - x0) * scale - 2 * inset}" '
+                  f'height="{size}" fill="{color}" stroke="none"/>\n')
+
+
+def export_svg(
+    rows: Iterable[Sequence[int]],
+    width: int,
+    height: int,
+    filename: str,
+    theme: Dict[str, str],
+    entry: Optional[Tuple[int, int]] = None,
+    exit_: Optional[Tuple[int, int]] = None,
+    path_cells: Optional[Set[Tuple[int, int]]] = None,
+    show_42: bool = True,
+    scale: int = 10,
+) -> None:
+    """
+    Write the maze as SVG, streaming one maze row at a time.
+
+    Collinear walls are merged: each row's horizontal walls become one
+    path of long runs, and vertical runs are tracked per column (O(width)
+    memory) and written when they end. Cell overlays are merged the
+    same way and inset so they never cover a wall stroke.
+    """
+    stroke = max(1, scale // 5)
+    inset = (stroke + 1) // 2
+    walls = _hex(ansi_to_rgb(theme["walls"]))
+    colors = {
+        ENDPOINT: _hex(ansi_to_rgb(theme["inner"])),
+        PATTERN: _hex(ansi_to_rgb(theme["pattern"])),
+        PATH: _hex(ansi_to_rgb(PATH_COLOR)),
+    }
+    fills = _fills_by_row(width, height, entry, exit_, path_cells, show_42)
+    run_start = [-1] * (width + 1)
+
+    with open(filename, "w") as out:
+        out.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'viewBox="{-stroke} {-stroke} {width * scale + 2 * stroke} '
+            f'{height * scale + 2 * stroke}">\n'
+            f'<rect x="{-stroke}" y="{-stroke}" '
+            f'width="{width * scale + 2 * stroke}" '
+            f'height="{height * scale + 2 * stroke}" '
+            f'fill="{_hex(BACKGROUND)}"/>\n'
+            f'<g stroke="{walls}" stroke-width="{stroke}" '
+            'stroke-linecap="square" fill="none">\n'
+        )
+
+        def horizontal(y: int, closed: Iterable[bool]) -> None:
+            d = []
+            start = -1
+            for x, wall in enumerate(list(closed) + [False]):
+                if wall and start < 0:
+                    start = x
+                elif not wall and start >= 0:
+                    d.append(f"M{start * scale} {y * scale}H{x * scale}")
+                    start = -1
+            if d:
+                out.write(f'<path d="{"".join(d)}"/>\n')
+
+        def vertical(y: int, closed: Sequence[bool]) -> None:
+            d = []
+            for x, wall in enumerate(closed):
+                if wall and run_start[x] < 0:
+                    run_start[x] = y
+                elif not wall and run_start[x] >= 0:
+                    d.append(f"M{x * scale} {run_start[x] * scale}"
+                             f"V{y * scale}")
+                    run_start[x] = -1
+            if d:
+                out.write(f'<path d="{"".join(d)}"/>\n')
+
+        last: Sequence[int] = ()
+        y = 0
+        for y, row in enumerate(rows):
+            row_fills = fills.get(y, {})
+            for code, color in colors.items():
+                runs: List[Tuple[int, int]] = []
+                for x in sorted(x for x, c in row_fills.items() if c == code):
+                    if runs and runs[-1][1] == x:
+                        runs[-1] = (runs[-1][0], x + 1)
+                    else:
+                        runs.append((x, x + 1))
+                _write_runs(out, runs, y, scale, inset, color)
+            horizontal(y, (cell & N != 0 for cell in row))
+            vertical(y, [cell & W != 0 for cell in row]
+                     + [row[-1] & E != 0])
+            last = row
+        horizontal(y + 1, (cell & S != 0 for cell in last))
+        vertical(y + 1, [False] * (width + 1))
+        out.write("</g>\n</svg>\n")
+
+
+def export_image(
+    filename: str,
+    rows: Iterable[Sequence[int]],
+    width: int,
+    height: int,
+    theme: Dict[str, str],
+    entry: Optional[Tuple[int, int]] = None,
+    exit_: Optional[Tuple[int, int]] = None,
+    path_cells: Optional[Set[Tuple[int, int]]] = None,
+    show_42: bool = True,
+) -> None:
+    """Export to PNG or SVG depending on the filename extension."""
+    if filename.lower().endswith(".png"):
+        export_png(rows, width, height, filename, theme, entry, exit_,
+                   path_cells, show_42)
+    elif filename.lower().endswith(".svg"):
+        export_svg(rows, width, height, filename, theme, entry, exit_,
+                   path_cells, show_42)
+    else:
+        raise ValueError(f"Unsupported image format: '{filename}'")
+
+
+def export_hex_file(
+    hex_filename: str,
+    image_filename: str,
+    theme: Dict[str, str],
+    show_path: bool = True,
+    show_42: bool = True,
+) -> None:
+    """
+    Export a hex maze file (the OUTPUT_FILE format) to PNG or SVG.
+    Rows are streamed from the file with iter_hex_rows(), so only the
+    path cells are kept in memory, whatever the maze size.
+    """
+    width, height, entry, exit_, letters = hex_file_info(hex_filename)
+    path_cells = None
+    if show_path:
+        try:
+            path_cells = path_letters_to_cells(entry, letters)
+        except KeyError:
+            raise ValueError(f"'{hex_filename}' path has letters other "
+                             "than NESW")
+    export_image(image_filename, iter_hex_rows(hex_filename), width, height,
+                 theme, entry, exit_, path_cells, show_42)
@@ -1,13 +1,45 @@
-import random
-from typing import List, Tuple, Set, Optional, Generator
+import itertools
+from typing import (TYPE_CHECKING, List, Tuple, Set, Optional, Generator,
+                    Iterable, Iterator)
+from .rng import make_rng
+if TYPE_CHECKING:
+    from .trace import TraceRecorder
 
 N, E, S, W = 1, 2, 4, 8
 DX = {E: 1, W: -1, N: 0, S: 0}
 DY = {E: 0, W: 0, N: -1, S: 1}
+OPPOSITE = {N: S, S: N, E: W, W: E}
+_VERSIONS = itertools.count(1)
+
+
+def pattern_42(width: int, height: int) -> Set[Tuple[int, int]]:
+    """Return coordinates of the centered 42 pattern for a maze size."""
+    start_x = (width - 7) // 2
+    start_y = (height - 5) // 2
+    pattern = [
+        "1000111",
+        "1000001",
+        "1110111",
+        "0010100",
+        "0010111",
+    ]
+    blocked: Set[Tuple[int, int]] = set()
+    for dy, row in enumerate(pattern):
+        for dx, char in enumerate(row):
+            if char == "1":
+                blocked.add((start_x + dx, start_y + dy))
+    return blocked
 
 
 class MazeGenerator:
-    """Generate perfect or imperfect maze using DFS with optional animation."""
+    """
+    Generate perfect or imperfect maze using DFS with optional animation.
+    rng selects the random source: 'legacy' replays random.Random(seed),
+    'counter' draws carving and loop-breaking from separate seekable
+    substreams (see mazegen.rng).
+    version changes on every wall edit and is unique across generators,
+    so it can key caches such as show_path.SolveCache.
+    """
 
     def __init__(
         self,
@@ -16,12 +48,18 @@ class MazeGenerator:
         entry: Tuple[int, int] = (0, 0),
         exit: Tuple[int, int] = (0, 0),
         seed: Optional[int] = None,
+        rng: str = "legacy",
     ) -> None:
         self.width = width
         self.height = height
         self.entry = entry
         self.exit = exit
-        self.rng = random.Random(str(seed))
+        self.rng = make_rng(seed, rng)
+        self.carve_rng = self.rng.substream("carve")
+        self.loop_rng = self.rng.substream("loops")
+        self.loops_added = 0
+        self.trace: Optional["TraceRecorder"] = None
+        self.version = next(_VERSIONS)
         self.grid: List[List[int]] = [
             [N | E | S | W for _ in range(width)]
             for _ in range(height)
@@ -30,26 +68,43 @@ class MazeGenerator:
             [False for _ in range(width)]
             for _ in range(height)
         ]
+        self._walled_row = [N | E | S | W] * width
+        self._open_row = [False] * width
+        # DFS buffers reused by every carve: flat cells y * width + x
+        # and the open directions of the current cell
+        self._stack = [0] * (width * height)
+        self._top = 0
+        self._dirs = [0] * 4
 
         self.blocked = self._create_42_pattern()
 
+    def reset(
+        self,
+        seed: Optional[int] = None,
+        entry: Optional[Tuple[int, int]] = None,
+        exit: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """
+        Prepare for a new maze of the same size, reusing the grid, visited
+        and blocked buffers and the RNG objects instead of reallocating.
+        The result is the same as a fresh MazeGenerator with these args.
+        """
+        if entry is not None:
+            self.entry = entry
+        if exit is not None:
+            self.exit = exit
+        # in legacy mode the three names share one object, reseeding it
+        # again is harmless
+        for rng in (self.rng, self.carve_rng, self.loop_rng):
+            rng.reseed(seed)
+        for row in self.grid:
+            row[:] = self._walled_row
+        self.loops_added = 0
+        self.version = next(_VERSIONS)
+
     def _create_42_pattern(self) -> Set[Tuple[int, int]]:
         """Return coordinates for 42 pattern."""
-        start_x = (self.width - 7) // 2
-        start_y = (self.height - 5) // 2
-        pattern = [
-            "1000111",
-            "1000001",
-            "1110111",
-            "0010100",
-            "0010111",
-        ]
-        blocked: Set[Tuple[int, int]] = set()
-        for dy, row in enumerate(pattern):
-            for dx, char in enumerate(row):
-                if char == "1":
-                    blocked.add((start_x + dx, start_y + dy))
-        return blocked
+        return pattern_42(self.width, self.height)
 
     def remove_wall(self, a: Tuple[int, int], b: Tuple[int, int]) -> None:
         """Remove wall between two adjacent cells."""
@@ -57,17 +112,24 @@ class MazeGenerator:
         x2, y2 = b
 
         if x2 == x1 + 1:
-            self.grid[y1][x1] &= ~E
-            self.grid[y2][x2] &= ~W
+            d = E
         elif x2 == x1 - 1:
-            self.grid[y1][x1] &= ~W
-            self.grid[y2][x2] &= ~E
+            d = W
         elif y2 == y1 + 1:
-            self.grid[y1][x1] &= ~S
-            self.grid[y2][x2] &= ~N
+            d = S
         elif y2 == y1 - 1:
-            self.grid[y1][x1] &= ~N
-            self.grid[y2][x2] &= ~S
+            d = N
+        else:
+            return
+        self._open_wall(x1, y1, d)
+
+    def _open_wall(self, x: int, y: int, d: int) -> None:
+        """Remove the wall on side d of (x, y) and the matching one."""
+        self.grid[y][x] &= ~d
+        self.grid[y + DY[d]][x + DX[d]] &= ~OPPOSITE[d]
+        self.version = next(_VERSIONS)
+        if self.trace is not None:
+            self.trace.record(x, y, d)
 
     def _break_random_walls(self) -> None:
         """
@@ -75,16 +137,17 @@ class MazeGenerator:
         - corridors stay max 2 cells wide/height
         - avoids merging too many open cells
         """
+        rng = self.loop_rng
         extra_paths = int((self.width * self.height) / 10)
         added = 0
         attempts = 0
         max_attempts = extra_paths * 20
 
         while added < extra_paths and attempts < max_attempts:
-            x = self.rng.randint(0, self.width - 1)
-            y = self.rng.randint(0, self.height - 1)
+            x = rng.randint(0, self.width - 1)
+            y = rng.randint(0, self.height - 1)
             directions = [N, E, S, W]
-            self.rng.shuffle(directions)
+            rng.shuffle(directions)
 
             for d in directions:
                 nx, ny = x + DX[d], y + DY[d]
@@ -111,6 +174,71 @@ class MazeGenerator:
                         added += 1
                         break
             attempts += 1
+        self.loops_added = added
+
+    def _start_carve(self) -> None:
+        """
+        Prepare the DFS: clear self.visited, pre-mark the 42 pattern so
+        a single lookup excludes both visited and blocked cells, and
+        push the entry.
+        """
+        visited = self.visited
+        for row in visited:
+            row[:] = self._open_row
+        for bx, by in self.blocked:
+            if 0 <= bx < self.width and 0 <= by < self.height:
+                visited[by][bx] = True
+        ex, ey = self.entry
+        visited[ey][ex] = True
+        self._stack[0] = ey * self.width + ex
+        self._top = 1
+
+    def _carve_step(self) -> int:
+        """
+        Run one DFS step: carve from the top cell to a random unvisited
+        neighbour, or backtrack. Returns the top cell as y * width + x,
+        or -1 once the carve is done. Only the preallocated stack and
+        direction buffers are used, so a step builds no lists.
+        """
+        if not self._top:
+            return -1
+        width, visited, dirs = self.width, self.visited, self._dirs
+        cell = self._stack[self._top - 1]
+        cy, cx = divmod(cell, width)
+        k = 0
+        if cy > 0 and not visited[cy - 1][cx]:
+            dirs[k] = N
+            k += 1
+        if cx < width - 1 and not visited[cy][cx + 1]:
+            dirs[k] = E
+            k += 1
+        if cy < self.height - 1 and not visited[cy + 1][cx]:
+            dirs[k] = S
+            k += 1
+        if cx > 0 and not visited[cy][cx - 1]:
+            dirs[k] = W
+            k += 1
+        if k:
+            # same draw as carve_rng.choice() over the k neighbours
+            d = dirs[self.carve_rng.randbelow(k)]
+            nx, ny = cx + DX[d], cy + DY[d]
+            self._open_wall(cx, cy, d)
+            visited[ny][nx] = True
+            self._stack[self._top] = ny * width + nx
+            self._top += 1
+        else:
+            self._top -= 1
+        return cell
+
+    def _carve(self) -> Generator[Tuple[int, int], None, None]:
+        """Run the DFS carve, yielding the current cell each step."""
+        self._start_carve()
+        width = self.width
+        while True:
+            cell = self._carve_step()
+            if cell < 0:
+                return
+            yield cell % width, cell // width
 
     def generate_animated(
         self,
@@ -121,34 +249,89 @@ class MazeGenerator:
         None
     ]:
         """Generate maze with animation, yields grid each step."""
-        visited = set()
-        blocked = self.blocked
-        stack = [self.entry]
-        visited.add(self.entry)
-        while stack:
-            cx, cy = stack[-1]
-            neighbors = []
-            for d in [N, E, S, W]:
-                nx, ny = cx + DX[d], cy + DY[d]
-                if 0 <= nx < self.width and 0 <= ny < self.height:
-                    if (nx, ny) not in visited and (nx, ny) not in blocked:
-                        neighbors.append((nx, ny))
-            if neighbors:
-                nx, ny = self.rng.choice(neighbors)
-                self.remove_wall((cx, cy), (nx, ny))
-                visited.add((nx, ny))
-                stack.append((nx, ny))
-            else:
-                stack.pop()
-            yield [row[:] for row in self.grid], (cx, cy)
+        for current in self._carve():
+            yield [row[:] for row in self.grid], current
 
         if not perfect:
             self._break_random_walls()
             yield [row[:] for row in self.grid], None
 
+    def generate(self, perfect: bool = True) -> List[List[int]]:
+        """
+        Generate maze without animation frames and return self.grid.
+        That is the generator's own buffer (the 42 pattern is never
+        carved, so it equals get_cells()): it changes on the next
+        reset(), call get_cells() for a copy to keep.
+        """
+        self._start_carve()
+        while self._carve_step() >= 0:
+            pass
+        if not perfect:
+            self._break_random_walls()
+        return self.grid
+
     def get_cells(self) -> List[List[int]]:
         """Return a copy of the grid, keeping blocked cells fully walled."""
         grid_copy = [row[:] for row in self.grid]
         for x, y in self.blocked:
             grid_copy[y][x] = N | E | S | W
         return grid_copy
+
+
+class MazePool:
+    """
+    Reusable MazeGenerators for many mazes of one size.
+    acquire() hands out a reset generator, release() gives it back.
+    """
+
+    def __init__(self, width: int, height: int, rng: str = "legacy") -> None:
+        self.width = width
+        self.height = height
+        self.rng = rng
+        self._free: List[MazeGenerator] = []
+
+    def acquire(
+        self,
+        seed: Optional[int] = None,
+        entry: Tuple[int, int] = (0, 0),
+        exit: Tuple[int, int] = (0, 0),
+    ) -> MazeGenerator:
+        """Return a generator ready for a new maze."""
+        if not self._free:
+            return MazeGenerator(self.width, self.height, entry, exit, seed,
+                                 self.rng)
+        generator = self._free.pop()
+        generator.reset(seed=seed, entry=entry, exit=exit)
+        return generator
+
+    def release(self, generator: MazeGenerator) -> None:
+        """Give a generator back to the pool."""
+        if (generator.width, generator.height) != (self.width, self.height):
+            raise ValueError("Generator size does not match the pool")
+        generator.trace = None
+        self._free.append(generator)
+
+    def generate_many(
+        self,
+        seeds: Iterable[Optional[int]],
+        entry: Tuple[int, int] = (0, 0),
+        exit: Tuple[int, int] = (0, 0),
+        perfect: bool = True,
+    ) -> Iterator[List[List[int]]]:
+        """
+        Yield one finished grid per seed from a single reused generator.
+        The yielded grid is the generator's buffer (the 42 pattern is
+        never carved, so it matches get_cells()): copy it to keep it
+        past the next iteration.
+        """
+        generator: Optional[MazeGenerator] = None
+        try:
+            for seed in seeds:
+                if generator is None:
+                    generator = self.acquire(seed, entry, exit)
+                else:
+                    generator.reset(seed=seed, entry=entry, exit=exit)
+                yield generator.generate(perfect)
+        finally:
+            if generator is not None:
+                self.release(generator)
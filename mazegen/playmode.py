@@ -1,8 +1,9 @@
 import os
 import time
 import pygame
-from typing import TYPE_CHECKING, Tuple, Dict
+from typing import TYPE_CHECKING, Callable, Tuple, Dict, Optional
 from mazegen.generator import E, N, S, W
+from mazegen.show_path import SolveCache
 from renderer import render_ascii
 if TYPE_CHECKING:
     from mazegen.generator import MazeGenerator
@@ -27,10 +28,15 @@ class PlayMode:
         entry: Tuple[int, int],
         exit_: Tuple[int, int],
         theme: Dict[str, str],
+        cache: Optional[SolveCache] = None,
+        render: Callable[..., None] = render_ascii,
     ) -> None:
         """
         Start interactive play mode.
         Move with WASD, lose hearts on invalid moves.
+        The shortest path length comes from the entry solve in cache,
+        the one export and [S] already share, so play solves nothing.
+        render draws the maze (render_ascii or renderer.render_compact).
         """
         os.system("clear")
         big_text = [
@@ -54,17 +60,22 @@ class PlayMode:
         px, py = entry
         goal_x, goal_y = exit_
         hearts = ["\033[1;31m\u2665\033[0m"] * 3
+        cache = cache or SolveCache()
+        # walls do not change while playing: copy and solve once
+        maze_cells = maze.get_cells()
+        best = len(cache.solve(maze_cells, entry, exit_, maze.version).path)
+        moves = 0
 
         while True:
             os.system("clear")
-            maze_cells = maze.get_cells()
             hearts_display = " ".join(hearts)
             status_bar = (f"hearts: [ {hearts_display} ] ║ Move with (W/A/S/D)"
+                          f" ║ moves {moves} (best {best})"
                           " ║ leave with 'ex'\n")
             print(f"{YELLOW}Guide the mouse 🐁 to the end. Can you escape to"
                   f" the cheese 🧀?{RESET}")
             print(f"\n{status_bar}")
-            render_ascii(
+            render(
                 maze_cells,
                 entry=(px, py),
                 exit_=exit_,
@@ -79,6 +90,7 @@ class PlayMode:
                 time.sleep(1.5)
                 break
             move = input("> ").strip().lower()
+            before = (px, py)
             if move == "w" and not (current_cell & N):
                 py -= 1
             elif move == "s" and not (current_cell & S):
@@ -101,3 +113,4 @@ class PlayMode:
                     pygame.mixer.music.play()
                     time.sleep(1.5)
                     break
+            moves += (px, py) != before
@@ -0,0 +1,134 @@
+import hashlib
+import random
+from typing import MutableSequence, Optional, Sequence, TypeVar, Union
+
+T = TypeVar("T")
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+RNG_MODES = ("legacy", "counter")
+
+
+def mix64(z: int) -> int:
+    """SplitMix64 finalizer: scramble a 64-bit integer."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def derive_key(seed: object, stream: str) -> int:
+    """Derive a 64-bit stream key from a seed and a stream name."""
+    data = f"{seed}/{stream}".encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          "little")
+
+
+class CounterRNG:
+    """
+    Counter-based SplitMix64 generator.
+    Draw n of a stream is mix64(key + (n + 1) * GOLDEN), so any draw
+    can be reached with seek() and named substreams never overlap,
+    whatever order or process they are consumed in.
+    """
+
+    def __init__(self, seed: object, stream: str = "root",
+                 counter: int = 0) -> None:
+        self.seed = seed
+        self.stream = stream
+        self.key = derive_key(seed, stream)
+        self.counter = counter
+
+    def at(self, counter: int) -> int:
+        """Return draw number counter without moving the stream."""
+        return mix64((self.key + (counter + 1) * GOLDEN) & MASK64)
+
+    def next64(self) -> int:
+        """Return the next 64-bit draw."""
+        value = self.at(self.counter)
+        self.counter += 1
+        return value
+
+    def seek(self, counter: int) -> None:
+        """Move the stream to draw number counter."""
+        self.counter = counter
+
+    def getstate(self) -> int:
+        """Return the stream position, enough to resume generation."""
+        return self.counter
+
+    def setstate(self, state: int) -> None:
+        """Restore a position returned by getstate()."""
+        self.counter = state
+
+    def reseed(self, seed: object) -> None:
+        """Restart this stream for another seed, keeping its name."""
+        self.seed = seed
+        self.key = derive_key(seed, self.stream)
+        self.counter = 0
+
+    def substream(self, name: str) -> "CounterRNG":
+        """Return the independent stream called name under this one."""
+        return CounterRNG(self.seed, f"{self.stream}/{name}")
+
+    def random(self) -> float:
+        """Return a float in [0, 1)."""
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def randbelow(self, n: int) -> int:
+        """Return an unbiased int in [0, n)."""
+        if n <= 0:
+            raise ValueError("n must be positive")
+        limit = (1 << 64) - (1 << 64) % n
+        while True:
+            value = self.next64()
+            if value < limit:
+                return value % n
+
+    def randint(self, a: int, b: int) -> int:
+        """Return an int in [a, b], like random.randint."""
+        return a + self.randbelow(b - a + 1)
+
+    def choice(self, seq: Sequence[T]) -> T:
+        """Return a random element of a non-empty sequence."""
+        return seq[self.randbelow(len(seq))]
+
+    def shuffle(self, seq: MutableSequence[T]) -> None:
+        """Shuffle a sequence in place (Fisher-Yates)."""
+        for i in reversed(range(1, len(seq))):
+            j = self.randbelow(i + 1)
+            seq[i], seq[j] = seq[j], seq[i]
+
+
+class LegacyRNG(random.Random):
+    """
+    The original random.Random(str(seed)) generator.
+    All substreams share one sequence so existing seeds reproduce.
+    """
+
+    def __init__(self, seed: object) -> None:
+        super().__init__(str(seed))
+
+    def reseed(self, seed: object) -> None:
+        """Restart the sequence as random.Random(str(seed)) would."""
+        self.seed(str(seed))
+
+    def substream(self, name: str) -> "LegacyRNG":
+        """Return self: legacy mode has a single sequential stream."""
+        return self
+
+    def randbelow(self, n: int) -> int:
+        """Return an int in [0, n), the draw choice() makes for n items."""
+        return self.choice(range(n))
+
+
+MazeRNG = Union[LegacyRNG, CounterRNG]
+
+
+def make_rng(seed: Optional[object], mode: str = "legacy") -> MazeRNG:
+    """Build the RNG for a maze: 'legacy' or 'counter'."""
+    if mode == "legacy":
+        return LegacyRNG(seed)
+    if mode == "counter":
+        return CounterRNG(seed)
+    raise ValueError(f"Unknown RNG mode '{mode}', expected one of "
+                     f"{', '.join(RNG_MODES)}")
@@ -1,7 +1,14 @@
-from typing import Dict, List, Tuple
+import hashlib
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 N, E, S, W = 1, 2, 4, 8
+# A BFS field: one signed 32-bit int per cell, indexed y * width + x
+Field = array
+# Candidate border cells compared pairwise when the maze has loops
+PAIR_CANDIDATES = 16
 DIRECTIONS = {N: (0, -1), E: (1, 0), S: (0, 1), W: (-1, 0)}
 OPPOSITE = {N: S, S: N, E: W, W: E}
 
@@ -14,8 +21,6 @@ class Solver:
         exit_: Tuple[int, int],
     ) -> List[int]:
         """BFS to get directions list (N,E,S,W)"""
-        from collections import deque
-
         queue = deque([entry])
         visited = {entry}
         parent: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
@@ -36,6 +41,205 @@ class Solver:
                         queue.append((nx, ny))
         return Solver.generate_path(parent, entry, exit_)
 
+    @staticmethod
+    def bfs_field(
+        grid: List[List[int]],
+        sources: Iterable[Tuple[int, int]],
+    ) -> Tuple[Field, Field]:
+        """
+        Multi-source BFS over the whole grid.
+        Cells are addressed by flat index y * width + x.
+        Returns (dist, parent) as array('i') fields: dist is -1 for
+        unreachable cells and parent is -1 for sources and unreachable
+        cells.
+        """
+        height = len(grid)
+        width = len(grid[0]) if height > 0 else 0
+        dist = array("i", [-1]) * (width * height)
+        parent = array("i", [-1]) * (width * height)
+        queue: deque = deque()
+        for x, y in sources:
+            i = y * width + x
+            if dist[i] == -1:
+                dist[i] = 0
+                queue.append(i)
+
+        while queue:
+            i = queue.popleft()
+            y, x = divmod(i, width)
+            cell = grid[y][x]
+            step = dist[i] + 1
+            for j, closed in (
+                (i - width, cell & N or y == 0),
+                (i + 1, cell & E or x == width - 1),
+                (i + width, cell & S or y == height - 1),
+                (i - 1, cell & W or x == 0),
+            ):
+                if not closed and dist[j] == -1:
+                    dist[j] = step
+                    parent[j] = i
+                    queue.append(j)
+        return dist, parent
+
+    @staticmethod
+    def border_cells(grid: List[List[int]]) -> List[Tuple[int, int]]:
+        """Open (not fully walled) cells on the maze border, row order."""
+        height = len(grid)
+        width = len(grid[0]) if height > 0 else 0
+        cells = []
+        for y in range(height):
+            xs = range(width) if y in (0, height - 1) else (0, width - 1)
+            for x in xs:
+                if grid[y][x] != N | E | S | W:
+                    cells.append((x, y))
+        return cells
+
+    @staticmethod
+    def farthest(
+        grid: List[List[int]],
+        sources: Iterable[Tuple[int, int]],
+        candidates: Optional[Iterable[Tuple[int, int]]] = None,
+    ) -> Tuple[Tuple[int, int], int]:
+        """
+        One multi-source BFS: return the cell (among candidates, default
+        all cells) farthest from its nearest source, with its distance.
+        With the border cells as sources this is the deepest cell.
+        """
+        dist, _ = Solver.bfs_field(grid, sources)
+        width = len(grid[0])
+        if candidates is None:
+            i = max(range(len(dist)), key=dist.__getitem__)
+            return (i % width, i // width), dist[i]
+        best = max(candidates, key=lambda c: dist[c[1] * width + c[0]])
+        return best, dist[best[1] * width + best[0]]
+
+    @staticmethod
+    def distance_matrix(
+        grid: List[List[int]],
+        sources: List[Tuple[int, int]],
+        targets: List[Tuple[int, int]],
+    ) -> List[Field]:
+        """
+        Many-to-many distances in one labelled BFS pass.
+        Every cell keeps a bitset (an int) of the sources that reached
+        it, and each level spreads the new bits of all fronts at once,
+        so a cell shared by several fronts is expanded once per level
+        rather than once per source. That pays off for nearby sources,
+        such as the border candidates of best_endpoints; sources spread
+        far apart reach cells at different levels and cost about one
+        BFS each. Returns one array('i') row per source, -1 for
+        unreachable.
+        """
+        height = len(grid)
+        width = len(grid[0]) if height > 0 else 0
+        rows = [array("i", [-1]) * len(targets) for _ in sources]
+        columns: List[List[int]] = [[] for _ in range(width * height)]
+        for col, (x, y) in enumerate(targets):
+            columns[y * width + x].append(col)
+        neighbours = Solver._adjacency(grid)
+        seen = [0] * (width * height)
+        bits_now = [0] * (width * height)
+        bits_next = [0] * (width * height)
+        front: List[int] = []
+        for row, (x, y) in enumerate(sources):
+            i = y * width + x
+            if not bits_now[i]:
+                front.append(i)
+            bits_now[i] |= 1 << row
+        level = 0
+        while front:
+            for i in front:
+                seen[i] |= bits_now[i]
+            spread: List[int] = []
+            for i in front:
+                bits = bits_now[i]
+                bits_now[i] = 0
+                for col in columns[i]:
+                    left = bits
+                    while left:
+                        low = left & -left
+                        rows[low.bit_length() - 1][col] = level
+                        left ^= low
+                for j in neighbours[i]:
+                    new = bits & ~seen[j] & ~bits_next[j]
+                    if new:
+                        if not bits_next[j]:
+                            spread.append(j)
+                        bits_next[j] |= new
+            bits_now, bits_next = bits_next, bits_now
+            front = spread
+            level += 1
+        return rows
+
+    @staticmethod
+    def _adjacency(grid: List[List[int]]) -> List[List[int]]:
+        """Open neighbours of every cell, as flat indices."""
+        height = len(grid)
+        width = len(grid[0]) if height > 0 else 0
+        neighbours: List[List[int]] = []
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                i = y * width + x
+                neighbours.append([j for j, closed in (
+                    (i - width, cell & N or y == 0),
+                    (i + 1, cell & E or x == width - 1),
+                    (i + width, cell & S or y == height - 1),
+                    (i - 1, cell & W or x == 0),
+                ) if not closed])
+        return neighbours
+
+    @staticmethod
+    def best_endpoints(
+        grid: List[List[int]],
+        entry: Optional[Tuple[int, int]] = None,
+        exit_: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """
+        Pick border cells for whichever of entry/exit is None so the
+        solution is as long as possible.
+        One given: a single BFS from it. Both missing: a sweep from the
+        cell farthest from any border cell (one multi-source BFS) to
+        the farthest border cell, then to the border cell farthest from
+        that. In a perfect maze (a tree) this is exact. With loops the
+        PAIR_CANDIDATES border cells farthest from the first end are
+        compared pairwise with one distance_matrix pass instead.
+        """
+        if entry is not None and exit_ is not None:
+            return entry, exit_
+        border = Solver.border_cells(grid)
+        if not border:
+            raise ValueError("No open border cell to place entry/exit")
+        if entry is not None:
+            return entry, Solver.farthest(grid, [entry], border)[0]
+        if exit_ is not None:
+            return Solver.farthest(grid, [exit_], border)[0], exit_
+        deepest, _ = Solver.farthest(grid, border)
+        first, _ = Solver.farthest(grid, [deepest], border)
+        dist, _ = Solver.bfs_field(grid, [first])
+        width = len(grid[0])
+        ranked = sorted(border, key=lambda c: -dist[c[1] * width + c[0]])
+        if not Solver._has_loops(grid):
+            return first, ranked[0]
+        pool = [first] + [c for c in ranked if c != first]
+        pool = pool[:PAIR_CANDIDATES]
+        matrix = Solver.distance_matrix(grid, pool, pool)
+        a, b = max(((a, b) for a in range(len(pool))
+                    for b in range(a + 1, len(pool))),
+                   key=lambda ab: matrix[ab[0]][ab[1]],
+                   default=(0, 0))
+        return pool[a], pool[b]
+
+    @staticmethod
+    def _has_loops(grid: List[List[int]]) -> bool:
+        """True if the open passages contain a cycle (edges >= cells)."""
+        edges = cells = 0
+        for row in grid:
+            for cell in row:
+                if cell != N | E | S | W:
+                    cells += 1
+                    edges += (cell & E == 0) + (cell & S == 0)
+        return edges >= cells
+
     @staticmethod
     def generate_path(
         parent: Dict,
@@ -69,3 +273,103 @@ class Solver:
             y += dy
             cells.append((x, y))
         return cells
+
+
+class SolveResult:
+    """One BFS solve: distance field and parent array from the entry,
+    plus the direction path to the exit."""
+
+    def __init__(
+        self,
+        entry: Tuple[int, int],
+        exit_: Tuple[int, int],
+        dist: Field,
+        parent: Field,
+        path: List[int],
+    ) -> None:
+        self.entry = entry
+        self.exit = exit_
+        self.dist = dist
+        self.parent = parent
+        self.path = path
+
+    @property
+    def cells(self) -> List[Tuple[int, int]]:
+        """Cells of the path, entry and exit included."""
+        return Solver.path_to_cells(self.entry, self.path)
+
+
+def grid_digest(grid: List[List[int]]) -> bytes:
+    """Content hash of a grid, used when no version is available."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in grid:
+        digest.update(bytes(row))
+    return digest.digest()
+
+
+class SolveCache:
+    """
+    Cache BFS fields for one maze at a time.
+    Entries are keyed on the grid version (MazeGenerator.version) or,
+    without one, on a content hash; a new key drops everything cached,
+    so regenerating or editing walls invalidates automatically.
+    """
+
+    def __init__(self) -> None:
+        self._key: Optional[Tuple[str, object]] = None
+        self._fields: Dict[Tuple[int, int], Tuple[Field, Field]] = {}
+        self._paths: Dict[Tuple[Tuple[int, int], Tuple[int, int]],
+                          List[int]] = {}
+
+    def invalidate(self) -> None:
+        """Drop every cached result."""
+        self._key = None
+        self._fields.clear()
+        self._paths.clear()
+
+    def _use(self, grid: List[List[int]], version: Optional[int]) -> None:
+        """Switch to the maze identified by version or grid content."""
+        key: Tuple[str, object] = (
+            ("version", version) if version is not None
+            else ("digest", grid_digest(grid))
+        )
+        if key != self._key:
+            self.invalidate()
+            self._key = key
+
+    def field(
+        self,
+        grid: List[List[int]],
+        source: Tuple[int, int],
+        version: Optional[int] = None,
+    ) -> Tuple[Field, Field]:
+        """Return the cached (dist, parent) BFS field from source."""
+        self._use(grid, version)
+        if source not in self._fields:
+            self._fields[source] = Solver.bfs_field(grid, [source])
+        return self._fields[source]
+
+    def solve(
+        self,
+        grid: List[List[int]],
+        entry: Tuple[int, int],
+        exit_: Tuple[int, int],
+        version: Optional[int] = None,
+    ) -> SolveResult:
+        """Return the cached shortest path from entry to exit."""
+        dist, parent = self.field(grid, entry, version)
+        if (entry, exit_) not in self._paths:
+            width = len(grid[0])
+            i = exit_[1] * width + exit_[0]
+            if dist[i] < 0:
+                raise ValueError(f"Exit {exit_} is not reachable "
+                                 f"from {entry}")
+            moves = {-width: S, width: N, -1: E, 1: W}
+            path = []
+            while parent[i] != -1:
+                path.append(moves[parent[i] - i])
+                i = parent[i]
+            path.reverse()
+            self._paths[(entry, exit_)] = path
+        return SolveResult(entry, exit_, dist, parent,
+                           self._paths[(entry, exit_)])
@@ -0,0 +1,229 @@
+"""
+Maze quality metrics over single grids or same-sized batches.
+
+Every metric is vectorized over the whole batch. The breadth-first
+passes behind reachability, solution length and the diameter advance
+all mazes one level per round, so their rounds follow the deepest maze
+of the batch rather than its size: long winding mazes (depth-first
+ones) still need as many rounds as their longest path.
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .generator import N, E, S, W
+
+Grid = Union[List[List[int]], np.ndarray]
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(16)], dtype=np.uint8)
+# batch_stats searches this many cells per chunk (eight 1000x1000
+# mazes); batch_bfs needs about 9 bytes per cell
+STATS_CHUNK_CELLS = 1 << 23
+
+
+def as_batch(grids: Union[Grid, Sequence[Grid]]) -> np.ndarray:
+    """Return grids as a (B, H, W) uint8 array of wall bitmasks."""
+    array = np.asarray(grids, dtype=np.uint8)
+    if array.ndim == 2:
+        array = array[np.newaxis]
+    if array.ndim != 3:
+        raise ValueError("Expected a grid or a batch of same-sized grids")
+    return array
+
+
+def degree_histogram(batch: np.ndarray) -> np.ndarray:
+    """
+    Count cells by number of open sides for every maze of a batch.
+    Returns a (B, 5) array: column k holds the cells with k openings,
+    so column 0 is the walled 42 pattern, 1 dead ends, 2 corridors
+    and 3-4 junctions.
+    """
+    degree = 4 - POPCOUNT[batch]
+    return np.stack(
+        [(degree == k).sum(axis=(1, 2)) for k in range(5)], axis=1
+    )
+
+
+def open_edges(batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (horizontal, vertical) boolean masks of open passages.
+    horizontal[b, y, x] links (x, y) to (x + 1, y) and vertical[b, y, x]
+    links (x, y) to (x, y + 1), read from the E and S bits like Solver.
+    """
+    return (batch[:, :, :-1] & E) == 0, (batch[:, :-1, :] & S) == 0
+
+
+def river_factor(batch: np.ndarray) -> np.ndarray:
+    """
+    Mean length of dead-end branches for every maze of a batch: cells
+    walked from each dead end through corridor cells before a junction
+    is reached. High values mean few long dead ends, low values many
+    short ones. All dead ends of the batch walk one cell per round, so
+    the rounds equal the longest branch, not the number of dead ends.
+    """
+    count, height, width = batch.shape
+    size = height * width
+    flat = batch.reshape(-1)
+    degree = 4 - POPCOUNT[flat]
+    cur = np.flatnonzero(degree == 1)
+    prev = np.full_like(cur, -1)
+    owner = cur // size
+    dead_ends = np.bincount(owner, minlength=count)
+    lengths = dead_ends.astype(np.int64)
+    while cur.size:
+        cell = flat[cur]
+        x, y = cur % width, cur % size // width
+        nxt = np.full_like(cur, -1)
+        for step, wall, inside in ((-width, N, y > 0), (1, E, x < width - 1),
+                                   (width, S, y < height - 1), (-1, W, x > 0)):
+            j = cur + step
+            nxt = np.where(inside & (cell & wall == 0) & (j != prev), j, nxt)
+        alive = nxt >= 0
+        alive[alive] = degree[nxt[alive]] == 2
+        prev, cur, owner = cur[alive], nxt[alive], owner[alive]
+        lengths += np.bincount(owner, minlength=count)
+    return np.where(dead_ends > 0, lengths / np.maximum(dead_ends, 1), 0.0)
+
+
+def batch_bfs(
+    batch: np.ndarray,
+    sources: Sequence[Tuple[int, int]],
+) -> np.ndarray:
+    """
+    Return (B, H, W) int32 distances from sources[b] in every maze b
+    of a batch, -1 where unreachable, like Solver.bfs_field.
+    All frontiers advance together, one level per round, so the rounds
+    follow the deepest maze and the numpy overhead of a round is shared
+    by the whole batch. The border counts as walled whatever its bits.
+    """
+    count, height, width = batch.shape
+    walls = batch.copy()
+    walls[:, 0, :] |= N
+    walls[:, -1, :] |= S
+    walls[:, :, 0] |= W
+    walls[:, :, -1] |= E
+    flat = walls.reshape(-1)
+    steps = [(step, (flat & wall) == 0)
+             for step, wall in ((-width, N), (1, E), (width, S), (-1, W))]
+    del walls, flat
+    dist = np.full(count * height * width, -1, dtype=np.int32)
+    front = (np.arange(count, dtype=np.int64) * (height * width)
+             + [y * width + x for x, y in sources])
+    dist[front] = 0
+    level = 0
+    while front.size:
+        level += 1
+        nxt = np.concatenate([front[open_[front]] + step
+                              for step, open_ in steps])
+        nxt = nxt[dist[nxt] == -1]
+        # Two cells of the frontier can share a neighbour in looped
+        # mazes: scatter a tag per candidate and keep the one that stuck
+        tag = -2 - np.arange(nxt.size, dtype=np.int32)
+        dist[nxt] = tag
+        front = nxt[dist[nxt] == tag]
+        dist[front] = level
+    return dist.reshape(count, height, width)
+
+
+def _farthest(dist: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (B, 2) (x, y) of the first cell in row order at the
+    largest distance of every maze, and those (B,) distances.
+    """
+    count, height, width = dist.shape
+    flat = dist.reshape(count, -1)
+    i = np.argmax(flat, axis=1)
+    y, x = np.divmod(i, width)
+    return np.stack([x, y], axis=1), flat[np.arange(count), i]
+
+
+def maze_stats(
+    grid: Grid,
+    entry: Tuple[int, int],
+    exit_: Tuple[int, int],
+    expected_loops: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Compute quality metrics for a single maze."""
+    return batch_stats(
+        as_batch(grid), [entry], [exit_],
+        None if expected_loops is None else [expected_loops],
+    )[0]
+
+
+def batch_stats(
+    grids: Union[Grid, Sequence[Grid]],
+    entries: Sequence[Tuple[int, int]],
+    exits: Sequence[Tuple[int, int]],
+    expected_loops: Optional[Sequence[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Compute quality metrics for a batch of same-sized mazes.
+
+    Everything is vectorized over the whole batch: solution length and
+    reachability come from one batch_bfs pass from the entries, the
+    diameter from a second one from the farthest cells it found.
+    Loops are counted inside the entry's component (edges - cells + 1),
+    which matches MazeGenerator.loops_added for generated mazes.
+
+    Returns one dict per maze, see stats_to_json for a JSON line.
+    """
+    batch = as_batch(grids)
+    count, height, width = batch.shape
+    hist = degree_histogram(batch)
+    horizontal, vertical = open_edges(batch)
+    degree = (4 - POPCOUNT[batch]).reshape(count, -1)
+    rivers = river_factor(batch)
+
+    reachable = np.zeros(count, dtype=np.int64)
+    edges = np.zeros(count, dtype=np.int64)
+    solution = np.zeros(count, dtype=np.int64)
+    far = np.zeros((count, 2), dtype=np.int64)
+    other = np.zeros((count, 2), dtype=np.int64)
+    diameter = np.zeros(count, dtype=np.int64)
+    step = max(1, STATS_CHUNK_CELLS // (width * height))
+    for start in range(0, count, step):
+        part = slice(start, start + step)
+        dist = batch_bfs(batch[part], entries[part])
+        reach = dist >= 0
+        reachable[part] = reach.sum(axis=(1, 2))
+        edges[part] = (
+            (horizontal[part] & reach[:, :, :-1]).sum(axis=(1, 2))
+            + (vertical[part] & reach[:, :-1, :]).sum(axis=(1, 2)))
+        solution[part] = [d[y, x] for d, (x, y) in zip(dist, exits[part])]
+        far[part], _ = _farthest(dist)
+        del dist, reach
+        other[part], diameter[part] = _farthest(
+            batch_bfs(batch[part], far[part].tolist()))
+
+    results = []
+    for b in range(count):
+        open_cells = int((degree[b] > 0).sum())
+        stats: Dict[str, Any] = {
+            "width": width,
+            "height": height,
+            "open_cells": open_cells,
+            "reachable_cells": int(reachable[b]),
+            "dead_ends": int(hist[b, 1]),
+            "corridors": int(hist[b, 2]),
+            "junctions": int(hist[b, 3] + hist[b, 4]),
+            "degree_histogram": [int(c) for c in hist[b]],
+            "solution_length": int(solution[b]),
+            "solution_fraction": (
+                (int(solution[b]) + 1) / open_cells
+                if solution[b] >= 0 else 0.0
+            ),
+            "river_factor": float(rivers[b]),
+            "diameter": int(diameter[b]),
+            "diameter_ends": [far[b].tolist(), other[b].tolist()],
+            "loops": int(edges[b] - reachable[b] + 1),
+        }
+        if expected_loops is not None:
+            stats["loops_match"] = stats["loops"] == expected_loops[b]
+        results.append(stats)
+    return results
+
+
+def stats_to_json(stats: Dict[str, Any]) -> str:
+    """Serialize one maze's stats as a compact JSON line."""
+    return json.dumps(stats, separators=(",", ":"))
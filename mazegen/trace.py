@@ -0,0 +1,218 @@
+import struct
+import sys
+import zlib
+from array import array
+from typing import TYPE_CHECKING, Generator, List, Optional, Tuple
+
+from .generator import N, E, S, W, DX, DY, OPPOSITE
+if TYPE_CHECKING:
+    from .generator import MazeGenerator
+
+MAGIC = b"MZTR"
+VERSION = 1
+HEADER = struct.Struct("<4sHIIiiiiIII")
+LENGTH = struct.Struct("<I")
+CODE_DIRS = (N, E, S, W)
+DIR_CODES = {N: 0, E: 1, S: 2, W: 3}
+FULL = N | E | S | W
+
+
+def _default_interval(width: int, height: int) -> int:
+    """About 16 checkpoints per full carve, never fewer than 1024 steps."""
+    return max(1024, width * height // 16)
+
+
+def _pack_grid(grid: List[List[int]]) -> bytes:
+    """Compress a grid, one byte per cell."""
+    return zlib.compress(bytes(v for row in grid for v in row))
+
+
+def _unpack_grid(data: bytes, width: int) -> List[List[int]]:
+    """Inverse of _pack_grid."""
+    raw = zlib.decompress(data)
+    return [list(raw[i:i + width]) for i in range(0, len(raw), width)]
+
+
+class TraceRecorder:
+    """
+    Record every wall a MazeGenerator removes.
+    Each carve is one 32-bit record: cell id << 2 | direction code.
+    A compressed grid checkpoint is kept every interval records.
+    """
+
+    def __init__(
+        self,
+        generator: "MazeGenerator",
+        interval: Optional[int] = None,
+    ) -> None:
+        if generator.width * generator.height >= 1 << 30:
+            raise ValueError("Maze too large to trace")
+        self.generator = generator
+        self.interval = interval or _default_interval(generator.width,
+                                                      generator.height)
+        self.steps = array("I")
+        self.checkpoints: List[bytes] = []
+        generator.trace = self
+
+    def record(self, x: int, y: int, direction: int) -> None:
+        """Log one carve from (x, y) towards direction."""
+        cell = y * self.generator.width + x
+        self.steps.append(cell << 2 | DIR_CODES[direction])
+        if len(self.steps) % self.interval == 0:
+            self.checkpoints.append(_pack_grid(self.generator.grid))
+
+    def detach(self) -> None:
+        """Stop recording."""
+        if self.generator.trace is self:
+            self.generator.trace = None
+
+    def save(self, filename: str) -> None:
+        """Write the trace file."""
+        gen = self.generator
+        steps = array("I", self.steps)
+        if sys.byteorder == "big":
+            steps.byteswap()
+        with open(filename, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, gen.width, gen.height,
+                gen.entry[0], gen.entry[1], gen.exit[0], gen.exit[1],
+                self.interval, len(steps), len(self.checkpoints),
+            ))
+            f.write(steps.tobytes())
+            for data in self.checkpoints:
+                f.write(LENGTH.pack(len(data)))
+                f.write(data)
+
+
+class Trace:
+    """A loaded trace: carve records plus grid checkpoints."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        entry: Tuple[int, int],
+        exit_: Tuple[int, int],
+        interval: int,
+        steps: array,
+        checkpoints: List[bytes],
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.entry = entry
+        self.exit = exit_
+        self.interval = interval
+        self.steps = steps
+        self.checkpoints = checkpoints
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def apply(self, grid: List[List[int]], step: int) -> Tuple[int, int]:
+        """Remove the walls of record step, return the carving cell."""
+        rec = self.steps[step]
+        d = CODE_DIRS[rec & 3]
+        y, x = divmod(rec >> 2, self.width)
+        grid[y][x] &= ~d
+        grid[y + DY[d]][x + DX[d]] &= ~OPPOSITE[d]
+        return x, y
+
+    def undo(self, grid: List[List[int]], step: int) -> Tuple[int, int]:
+        """Put back the walls of record step, return the carving cell."""
+        rec = self.steps[step]
+        d = CODE_DIRS[rec & 3]
+        y, x = divmod(rec >> 2, self.width)
+        grid[y][x] |= d
+        grid[y + DY[d]][x + DX[d]] |= OPPOSITE[d]
+        return x, y
+
+    def grid_at(self, step: int) -> List[List[int]]:
+        """Return the grid after the first step records, in O(interval)."""
+        step = max(0, min(step, len(self.steps)))
+        k = min(step // self.interval, len(self.checkpoints))
+        if k == 0:
+            grid = [[FULL] * self.width for _ in range(self.height)]
+        else:
+            grid = _unpack_grid(self.checkpoints[k - 1], self.width)
+        for i in range(k * self.interval, step):
+            self.apply(grid, i)
+        return grid
+
+
+def load_trace(filename: str) -> Trace:
+    """Read a file written by TraceRecorder.save()."""
+    with open(filename, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"'{filename}' is not a maze trace")
+        (magic, version, width, height, ex, ey, ox, oy,
+         interval, count, n_checkpoints) = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{filename}' is not a maze trace")
+        steps = array("I")
+        steps.frombytes(f.read(count * steps.itemsize))
+        if sys.byteorder == "big":
+            steps.byteswap()
+        checkpoints = []
+        for _ in range(n_checkpoints):
+            (length,) = LENGTH.unpack(f.read(LENGTH.size))
+            checkpoints.append(f.read(length))
+    return Trace(width, height, (ex, ey), (ox, oy), interval, steps,
+                 checkpoints)
+
+
+class TracePlayer:
+    """
+    Seek and play a Trace forward or backward at any speed.
+    Short moves walk records one by one (carves are undone by putting
+    the walls back), long jumps restart from the nearest checkpoint.
+    """
+
+    def __init__(self, trace: Trace) -> None:
+        self.trace = trace
+        self.position = 0
+        self.grid = trace.grid_at(0)
+
+    def seek(self, step: int) -> Optional[Tuple[int, int]]:
+        """Move to step, return the cell carving at that step if any."""
+        trace = self.trace
+        step = max(0, min(step, len(trace)))
+        current = None
+        if abs(step - self.position) > trace.interval:
+            self.grid = trace.grid_at(step)
+            self.position = step
+        while self.position < step:
+            current = trace.apply(self.grid, self.position)
+            self.position += 1
+        while self.position > step:
+            self.position -= 1
+            current = trace.undo(self.grid, self.position)
+        return current
+
+    def frames(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        speed: int = 1,
+    ) -> Generator[
+        Tuple[List[List[int]], Optional[Tuple[int, int]]],
+        None,
+        None
+    ]:
+        """
+        Yield (grid, current_cell) every speed steps from start to stop,
+        like generate_animated. A negative speed plays backward.
+        The yielded grid is the player's own buffer: do not modify it.
+        """
+        if stop is None:
+            stop = len(self.trace) if speed > 0 else 0
+        if speed == 0:
+            raise ValueError("speed cannot be 0")
+        self.seek(start)
+        yield self.grid, None
+        for step in range(start + speed, stop + speed, speed):
+            step = min(step, stop) if speed > 0 else max(step, stop)
+            current = self.seek(step)
+            yield self.grid, current
+            if step == stop:
+                break
@@ -0,0 +1,255 @@
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .export import LETTERS, hex_file_info, iter_hex_rows
+from .generator import N, E, S, W, DX, DY, pattern_42
+from .show_path import Solver
+from .stats import Grid
+
+FULL = N | E | S | W
+
+
+class Violation:
+    """First broken invariant of a maze: rule name, cell and details."""
+
+    def __init__(self, rule: str, cell: Tuple[int, int], message: str) -> None:
+        self.rule = rule
+        self.cell = cell
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f"Violation({self.rule!r}, {self.cell!r}, {self.message!r})"
+
+    def __str__(self) -> str:
+        return f"{self.rule} at {self.cell}: {self.message}"
+
+
+def _first(mask: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Return the first True cell of a (H, W) mask in row order as (x, y)."""
+    hits = np.flatnonzero(mask)
+    if hits.size == 0:
+        return None
+    y, x = divmod(int(hits[0]), mask.shape[1])
+    return x, y
+
+
+def component_labels(
+    horizontal: np.ndarray,
+    vertical: np.ndarray,
+) -> np.ndarray:
+    """
+    Label connected cells with a vectorized union-find.
+    horizontal/vertical are the open-passage masks of stats.open_edges
+    for one grid. Every round hooks each edge's larger root under the
+    smaller one, then path-halves until all cells point at a root, so
+    labels end as the smallest flat index of each component.
+    """
+    height, width = vertical.shape[0] + 1, horizontal.shape[1] + 1
+    index = np.arange(height * width).reshape(height, width)
+    u = np.concatenate([index[:, :-1][horizontal], index[:-1, :][vertical]])
+    v = np.concatenate([index[:, 1:][horizontal], index[1:, :][vertical]])
+    parent = np.arange(height * width)
+    while True:
+        pu, pv = parent[u], parent[v]
+        differ = pu != pv
+        if not differ.any():
+            return parent
+        np.minimum.at(parent, np.maximum(pu, pv)[differ],
+                      np.minimum(pu, pv)[differ])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def _first_cycle_cell(
+    horizontal: np.ndarray,
+    vertical: np.ndarray,
+) -> Optional[Tuple[int, int]]:
+    """Return the cell of the first edge closing a loop, in row order."""
+    height, width = vertical.shape[0] + 1, horizontal.shape[1] + 1
+    parent = list(range(height * width))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for y in range(height):
+        for x in range(width):
+            i = y * width + x
+            for ok, j in ((x < width - 1 and horizontal[y, x], i + 1),
+                          (y < height - 1 and vertical[y, x], i + width)):
+                if not ok:
+                    continue
+                a, b = find(i), find(j)
+                if a == b:
+                    return x, y
+                parent[b] = a
+    return None
+
+
+def validate_grid(
+    grid: Grid,
+    perfect: bool = False,
+    entry: Optional[Tuple[int, int]] = None,
+    exit_: Optional[Tuple[int, int]] = None,
+    path: Optional[Sequence[int]] = None,
+) -> Optional[Violation]:
+    """
+    Check a maze and return its first violation, or None if valid.
+
+    Rules, in order: neighbouring wall bits agree, border walls are
+    closed, 42 pattern cells are fully walled, every other cell is
+    connected, the maze is a spanning tree when perfect, no open area is
+    wider than 2 cells both ways, and path (if given) is a shortest
+    path from entry to exit.
+    """
+    g = np.asarray(grid, dtype=np.uint8)
+    height, width = g.shape
+
+    cell = _first((g[:, :-1] & E != 0) != (g[:, 1:] & W != 0))
+    if cell is not None:
+        return Violation("walls", cell, "E wall disagrees with W neighbour")
+    cell = _first((g[:-1, :] & S != 0) != (g[1:, :] & N != 0))
+    if cell is not None:
+        return Violation("walls", cell, "S wall disagrees with N neighbour")
+
+    border = np.zeros_like(g, dtype=bool)
+    border[0, :] |= (g[0, :] & N) == 0
+    border[-1, :] |= (g[-1, :] & S) == 0
+    border[:, 0] |= (g[:, 0] & W) == 0
+    border[:, -1] |= (g[:, -1] & E) == 0
+    cell = _first(border)
+    if cell is not None:
+        return Violation("border", cell, "border wall is open")
+
+    blocked = np.zeros_like(g, dtype=bool)
+    if width >= 9 and height >= 7:
+        for x, y in pattern_42(width, height):
+            blocked[y, x] = True
+    cell = _first(blocked & (g != FULL))
+    if cell is not None:
+        return Violation("pattern", cell, "42 pattern cell is not walled")
+
+    horizontal = (g[:, :-1] & E) == 0
+    vertical = (g[:-1, :] & S) == 0
+    labels = component_labels(horizontal, vertical).reshape(height, width)
+    open_cells = ~blocked
+    if entry is not None:
+        root = labels[entry[1], entry[0]]
+    else:
+        start = _first(open_cells)
+        root = labels[start[1], start[0]] if start else 0
+    cell = _first(open_cells & (labels != root))
+    if cell is not None:
+        return Violation("connectivity", cell, "cell is not reachable")
+
+    if perfect:
+        edges = int(horizontal.sum() + vertical.sum())
+        if edges != int(open_cells.sum()) - 1:
+            cell = _first_cycle_cell(horizontal, vertical) or (0, 0)
+            return Violation("spanning_tree", cell,
+                             "perfect maze contains a loop")
+
+    room = (horizontal[:-1, :] & horizontal[1:, :]
+            & vertical[:, :-1] & vertical[:, 1:])
+    wide = np.zeros_like(g, dtype=bool)
+    wide[:-1, :-2] |= room[:, :-1] & room[:, 1:]
+    wide[:-2, :-1] |= room[:-1, :] & room[1:, :]
+    cell = _first(wide)
+    if cell is not None:
+        return Violation("corridor_width", cell,
+                         "open area wider than 2 cells")
+
+    if path is not None and entry is not None and exit_ is not None:
+        return _check_path(g.tolist(), entry, exit_, path)
+    return None
+
+
+def _check_path(
+    grid: List[List[int]],
+    entry: Tuple[int, int],
+    exit_: Tuple[int, int],
+    path: Sequence[int],
+) -> Optional[Violation]:
+    """Check path follows open walls from entry to exit and is shortest."""
+    x, y = entry
+    for d in path:
+        if grid[y][x] & d:
+            return Violation("path", (x, y), "path crosses a wall")
+        x, y = x + DX[d], y + DY[d]
+    if (x, y) != exit_:
+        return Violation("path", (x, y), f"path ends away from {exit_}")
+    dist, _ = Solver.bfs_field(grid, [entry])
+    shortest = dist[exit_[1] * len(grid[0]) + exit_[0]]
+    if len(path) != shortest:
+        return Violation("path", exit_, f"path has {len(path)} steps, "
+                         f"shortest is {shortest}")
+    return None
+
+
+def validate_file(filename: str, perfect: bool = False) -> Optional[Violation]:
+    """Validate a hex maze file, including its entry, exit and path."""
+    _, _, entry, exit_, letters = hex_file_info(filename)
+    grid = list(iter_hex_rows(filename))
+    try:
+        path = [LETTERS[letter] for letter in letters]
+    except KeyError:
+        return Violation("path", entry, "path has letters other than NESW")
+    return validate_grid(grid, perfect, entry, exit_, path)
+
+
+def _validate_one(args: Tuple[str, bool]) -> Optional[Violation]:
+    """validate_file for ProcessPoolExecutor.map."""
+    filename, perfect = args
+    try:
+        return validate_file(filename, perfect)
+    except (OSError, ValueError) as error:
+        return Violation("file", (0, 0), str(error))
+
+
+def validate_directory(
+    directory: str,
+    perfect: bool = False,
+    workers: Optional[int] = None,
+    pattern: str = "*.txt",
+) -> Dict[str, Optional[Violation]]:
+    """Validate every matching hex file of a directory in parallel."""
+    files = sorted(glob.glob(os.path.join(directory, pattern)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_validate_one, [(f, perfect) for f in files],
+                           chunksize=16)
+        return dict(zip(files, results))
+
+
+def main() -> None:
+    """python3 -m mazegen.validate [--perfect] FILE_OR_DIR..."""
+    args = sys.argv[1:]
+    perfect = "--perfect" in args
+    targets = [a for a in args if a != "--perfect"]
+    if not targets:
+        print("Usage: python3 -m mazegen.validate [--perfect] FILE_OR_DIR...")
+        sys.exit(1)
+    failed = 0
+    for target in targets:
+        if os.path.isdir(target):
+            results = validate_directory(target, perfect)
+        else:
+            results = {target: _validate_one((target, perfect))}
+        for filename, violation in results.items():
+            if violation is not None:
+                failed += 1
+                print(f"{filename}: {violation}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
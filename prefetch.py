@@ -0,0 +1,120 @@
+import queue
+import random
+import threading
+from typing import List, Optional, Tuple
+
+from config import Config, generation_endpoints, resolve_endpoints
+from mazegen import MazeGenerator, MazePool
+from mazegen.show_path import SolveCache
+from mazegen.trace import TraceRecorder
+
+
+class Prefetched:
+    """A maze generated and solved ahead of time."""
+
+    def __init__(
+        self,
+        generator: MazeGenerator,
+        grid: List[List[int]],
+        seed: int,
+        entry: Tuple[int, int],
+        exit_: Tuple[int, int],
+        cache: SolveCache,
+        recorder: Optional[TraceRecorder],
+        key: Tuple[object, ...],
+    ) -> None:
+        self.generator = generator
+        self.grid = grid
+        self.seed = seed
+        self.entry = entry
+        self.exit = exit_
+        self.cache = cache
+        self.recorder = recorder
+        self.key = key
+
+
+def config_key(config: Config) -> Tuple[object, ...]:
+    """Settings a prefetched maze depends on."""
+    return (config.width, config.height,
+            "auto" if config.auto_entry else config.entry,
+            "auto" if config.auto_exit else config.exit,
+            config.perfect, config.seed, config.rng, config.trace_file)
+
+
+class Prefetcher:
+    """
+    Generate and solve the next [R] mazes in a background thread.
+
+    Up to depth mazes wait in a bounded queue. take() returns one
+    without blocking, or None if none is ready yet. There is no explicit
+    cancel: the config cannot change while the menu runs and the palette
+    only affects rendering, so take() simply drops (and recycles) any
+    item whose config_key no longer matches. Generators come from a
+    MazePool and go back with recycle() once swapped out.
+    """
+
+    def __init__(self, config: Config, depth: int = 1) -> None:
+        self.config = config
+        self._ready: "queue.Queue[Prefetched]" = queue.Queue(maxsize=depth)
+        self._pool = MazePool(config.width, config.height, config.rng)
+        self._pool_lock = threading.Lock()
+        self._seeds = random.Random()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _build(self, key: Tuple[object, ...]) -> Prefetched:
+        """Generate, solve and optionally trace one maze."""
+        config = self.config
+        seed = (config.seed if config.seed is not None
+                else self._seeds.randint(0, 999999))
+        entry, exit_ = generation_endpoints(config)
+        with self._pool_lock:
+            generator = self._pool.acquire(seed, entry, exit_)
+        recorder = TraceRecorder(generator) if config.trace_file else None
+        grid = generator.generate(perfect=config.perfect)
+        if recorder is not None:
+            recorder.detach()
+        entry, exit_ = resolve_endpoints(config, grid)
+        generator.entry, generator.exit = entry, exit_
+        cache = SolveCache()
+        cache.solve(grid, entry, exit_, generator.version)
+        return Prefetched(generator, grid, seed, entry, exit_, cache,
+                          recorder, key)
+
+    def _run(self) -> None:
+        """Worker loop: keep the queue full until close()."""
+        while not self._stop.is_set():
+            item = self._build(config_key(self.config))
+            while not self._stop.is_set():
+                try:
+                    self._ready.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                self.recycle(item.generator)
+
+    def take(self) -> Optional[Prefetched]:
+        """Return a ready maze for the current settings, or None."""
+        key = config_key(self.config)
+        while True:
+            try:
+                item = self._ready.get_nowait()
+            except queue.Empty:
+                return None
+            if item.key == key:
+                return item
+            self.recycle(item.generator)
+
+    def recycle(self, generator: MazeGenerator) -> None:
+        """Give a swapped-out generator back for reuse."""
+        if (generator.width, generator.height) == (self.config.width,
+                                                   self.config.height):
+            with self._pool_lock:
+                self._pool.release(generator)
+
+    def close(self) -> None:
+        """Stop the worker thread (it is a daemon if a build is running)."""
+        self._stop.set()
+        self._thread.join(timeout=1.0)
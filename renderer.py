@@ -1,4 +1,4 @@
-from typing import List, Tuple, Set, Dict, Optional
+from typing import Callable, List, Tuple, Set, Dict, Optional
 
 PALETTES: List[Dict[str, str]] = [
     {"name": "Classic/Bold", "walls": "38;5;160", "inner": "38;5;231",
@@ -16,6 +16,10 @@ PALETTES: List[Dict[str, str]] = [
 ]
 
 ORANGE = "38;5;208"
+# render_compact pixels for the entry (the mouse, or the player in play
+# mode) and the exit (the cheese), apart from every palette color
+ENTRY_COLOR = "38;5;51"
+EXIT_COLOR = "38;5;46"
 PATH_SYMBOL = "\u272F"
 N, E, S, W = 1, 2, 4, 8
 
@@ -109,3 +113,98 @@ def render_ascii(
     bottom_line = BL + "".join(H_WALL + (JB if x < width - 1 else BR)
                                for x in range(width))
     print(bottom_line)
+
+
+def _background(code: str) -> str:
+    """Turn a foreground color code ('38;5;160', '33') into background."""
+    if code.startswith("38;"):
+        return "48;" + code[3:]
+    return str(int(code) + 10)
+
+
+def render_compact(
+    grid: List[List[int]],
+    entry: Tuple[int, int],
+    exit_: Tuple[int, int],
+    origin_theme: Dict[str, str],
+    show_42: bool = False,
+    path_cells: Optional[Set[Tuple[int, int]]] = None,
+    current_cell: Optional[Tuple[int, int]] = None
+) -> None:
+    """
+    Render the maze with half blocks, same parameters as render_ascii.
+
+    Walls and cells are mapped onto a (2 * height + 1) x (2 * width + 1)
+    pixel raster (one pixel per cell, one per wall, one per corner) and
+    each terminal line draws two raster rows with '\u2580', top pixel
+    in the foreground color and bottom pixel in the background color.
+    Escape sequences are only written when the colors change. The
+    entry (the player in play mode) is ENTRY_COLOR and the exit is
+    EXIT_COLOR, standing in for the mouse and cheese of render_ascii.
+    """
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    p42 = get_42_pattern_coords(width, height) if show_42 else set()
+    walls = origin_theme["walls"]
+    raster: List[List[Optional[str]]] = []
+
+    for y in range(height + 1):
+        row = grid[min(y, height - 1)]
+        bit = N if y < height else S
+        line: List[Optional[str]] = []
+        for cell in row:
+            line.append(walls)
+            line.append(walls if cell & bit else None)
+        line.append(walls)
+        raster.append(line)
+        if y == height:
+            break
+
+        line = []
+        for x, cell in enumerate(row):
+            pos = (x, y)
+            line.append(walls if cell & W else None)
+            if pos == entry:
+                line.append(ENTRY_COLOR)
+            elif pos == exit_:
+                line.append(EXIT_COLOR)
+            elif current_cell and pos == current_cell:
+                line.append("33")
+            elif path_cells and pos in path_cells:
+                line.append(ORANGE)
+            elif pos in p42:
+                line.append(origin_theme["pattern"])
+            else:
+                line.append(None)
+        line.append(walls if row[-1] & E else None)
+        raster.append(line)
+
+    raster.append([None] * (2 * width + 1))
+    out = []
+    for top_row, bottom_row in zip(raster[::2], raster[1::2]):
+        text = ""
+        state: Tuple[Optional[str], Optional[str]] = (None, None)
+        for top, bottom in zip(top_row, bottom_row):
+            want: Tuple[Optional[str], Optional[str]]
+            if top == bottom:
+                want, char = (top, None), ("\u2588" if top else " ")
+            elif top is None:
+                want, char = (bottom, None), "\u2584"
+            elif bottom is None:
+                want, char = (top, None), "\u2580"
+            else:
+                want, char = (top, _background(bottom)), "\u2580"
+            if char == " ":
+                want = (state[0], None)
+            if want != state:
+                text += "\033[0" + "".join(f";{c}" for c in want if c) + "m"
+                state = want
+            text += char
+        out.append(text + "\033[0m")
+    print("\n".join(out))
+
+
+RENDERERS: Dict[str, Callable[..., None]] = {
+    "ascii": render_ascii,
+    "compact": render_compact,
+}
@@ -7,4 +7,5 @@ setup(
     description="Maze generator and solver",
     author="massegu & selhor",
     python_requires=">=3.8",
+    extras_require={"numpy": ["numpy"]},
 )